@@ -0,0 +1,304 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from main import Grafo
+
+def familia_aneis(n, semente):
+    # Componentes em anel ligados em cadeia, como no teste de desempenho original
+    num_componentes = 5
+    tamanho_componente = max(3, n // num_componentes)
+    origens = []
+    destinos = []
+    for i in range(num_componentes):
+        vertices = list(range(i * tamanho_componente, (i + 1) * tamanho_componente))
+        origens.extend(vertices)
+        destinos.extend(vertices[1:] + vertices[:1])
+        if i:
+            origens.append(vertices[0] - 1)
+            destinos.append(vertices[0])
+    return num_componentes * tamanho_componente, origens, destinos, False
+
+def familia_aleatorio(n, semente, dirigido=False):
+    rnd = random.Random(semente)
+    m = 3 * n
+    origens = [rnd.randrange(n) for _ in range(m)]
+    destinos = [rnd.randrange(n) for _ in range(m)]
+    return n, origens, destinos, dirigido
+
+def familia_aleatorio_dirigido(n, semente):
+    return familia_aleatorio(n, semente, True)
+
+def familia_grade(n, semente):
+    lado = max(2, int(n ** 0.5))
+    origens = []
+    destinos = []
+    for i in range(lado):
+        for j in range(lado):
+            v = i * lado + j
+            if j + 1 < lado:
+                origens.append(v)
+                destinos.append(v + 1)
+            if i + 1 < lado:
+                origens.append(v)
+                destinos.append(v + lado)
+    return lado * lado, origens, destinos, False
+
+def familia_arvore(n, semente):
+    rnd = random.Random(semente)
+    origens = [rnd.randrange(v) for v in range(1, n)]
+    destinos = list(range(1, n))
+    return n, origens, destinos, False
+
+def familia_circulante(n, semente):
+    # Cada vértice liga-se a v+1 e v+3: todos os graus são 4, portanto o grafo é euleriano
+    n = max(n, 7)
+    origens = list(range(n)) * 2
+    destinos = [(v + 1) % n for v in range(n)] + [(v + 3) % n for v in range(n)]
+    return n, origens, destinos, False
+
+def familia_ciclos_dirigidos(n, semente):
+    num_vertices, origens, destinos, _ = familia_aneis(n, semente)
+    return num_vertices, origens, destinos, True
+
+FAMILIAS = {
+    "aneis": familia_aneis,
+    "aleatorio": familia_aleatorio,
+    "aleatorio_dirigido": familia_aleatorio_dirigido,
+    "grade": familia_grade,
+    "arvore": familia_arvore,
+    "circulante": familia_circulante,
+    "ciclos_dirigidos": familia_ciclos_dirigidos,
+}
+
+class _Caso:
+    def __init__(self, dados, semente):
+        self.dados = dados
+        num_vertices, origens, destinos, dirigido = dados
+        self.grafo = Grafo.from_arrays(origens, destinos, num_vertices=num_vertices, dirigido=dirigido)
+        rnd = random.Random(semente)
+        self.consultas = [(rnd.randrange(num_vertices), rnd.randrange(num_vertices)) for _ in range(10000)]
+
+    def preparar(self):
+        # Cada repetição parte do grafo sem o CSR congelado nem resultados guardados
+        self.grafo.invalidar_cache()
+
+def _op_construcao(caso):
+    num_vertices, origens, destinos, dirigido = caso.dados
+    Grafo.from_arrays(origens, destinos, num_vertices=num_vertices, dirigido=dirigido)
+
+def _op_construcao_incremental(caso):
+    num_vertices, origens, destinos, dirigido = caso.dados
+    grafo = Grafo(num_vertices, dirigido)
+    for u, v in zip(origens, destinos):
+        grafo.adicionar_aresta(u, v)
+
+def _op_checar_adjacencia(caso):
+    checar = caso.grafo.checar_adjacencia_vertices
+    for u, v in caso.consultas:
+        checar(u, v)
+
+def _op_exportar_gexf(caso):
+    caso.grafo.exportar_para_gexf("benchmark.gexf")
+
+def _op_exportar_txt(caso):
+    caso.grafo.exportar_para_txt("benchmark.txt")
+
+def _op_exportar_ppm(caso):
+    caso.grafo.exportar_para_ppm("benchmark.ppm", max_quadros=10)
+
+def _op_exportar_todos(caso):
+    caso.grafo.exportar_todos("benchmark", max_quadros=10)
+
+# nome: (função, restrição de direção, limite de vértices)
+OPERACOES = {
+    "construcao": (_op_construcao, None, None),
+    "construcao_incremental": (_op_construcao_incremental, None, None),
+    "checar_adjacencia": (_op_checar_adjacencia, None, None),
+    "pontes_naive": (lambda caso: caso.grafo.identificar_pontes_naive(), "nao_dirigido", 2000),
+    "pontes_tarjan": (lambda caso: caso.grafo.identificar_pontes_tarjan(), None, None),
+    "articulacoes": (lambda caso: caso.grafo.identificar_articulacoes(), None, None),
+    "scc": (lambda caso: caso.grafo.kosaraju_scc(), "dirigido", None),
+    "grafo_conexo": (lambda caso: caso.grafo.grafo_conexo(), None, None),
+    "fortemente_conexo": (lambda caso: caso.grafo.grafo_fortemente_conexo(), "dirigido", None),
+    "conexo_fraco": (lambda caso: caso.grafo.grafo_conexo_fraco(), "dirigido", None),
+    "semi_fortemente_conexo": (lambda caso: caso.grafo.grafo_semi_fortemente_conexo(), "dirigido", None),
+    "fleury": (lambda caso: caso.grafo.fleury(), None, None),
+    "exportar_gexf": (_op_exportar_gexf, None, None),
+    "exportar_txt": (_op_exportar_txt, None, 2000),
+    "exportar_ppm": (_op_exportar_ppm, None, 20000),
+    "exportar_todos": (_op_exportar_todos, None, 2000),
+}
+
+def _executar_caso(conexao, familia, tamanho, operacao, repeticoes, aquecimento, semente):
+    diretorio_original = os.getcwd()
+    try:
+        # Os exportadores gravam em "dados/" relativo ao diretório atual; cada caso usa um diretório temporário
+        with tempfile.TemporaryDirectory() as diretorio, open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            os.chdir(diretorio)
+            try:
+                dados = FAMILIAS[familia](tamanho, semente)
+                caso = _Caso(dados, semente)
+                funcao = OPERACOES[operacao][0]
+                for _ in range(aquecimento):
+                    caso.preparar()
+                    funcao(caso)
+                tempos = []
+                for _ in range(repeticoes):
+                    caso.preparar()
+                    inicio = time.perf_counter()
+                    funcao(caso)
+                    tempos.append(time.perf_counter() - inicio)
+                vertices, arestas = caso.grafo.contar_vertices_arestas()
+            finally:
+                os.chdir(diretorio_original)
+        conexao.send({"status": "ok", "vertices": vertices, "arestas": arestas, "tempos": tempos})
+    except Exception as erro:
+        conexao.send({"status": "erro", "erro": f"{type(erro).__name__}: {erro}"})
+    finally:
+        conexao.close()
+
+def medir_caso(familia, tamanho, operacao, repeticoes=5, aquecimento=1, limite_tempo=60.0, semente=0):
+    resultado = {"familia": familia, "tamanho": tamanho, "operacao": operacao}
+    restricao, limite_vertices = OPERACOES[operacao][1:]
+    dirigido = FAMILIAS[familia](3, semente)[3]
+    if (restricao == "dirigido" and not dirigido) or (restricao == "nao_dirigido" and dirigido):
+        resultado["status"] = "nao_aplicavel"
+        return resultado
+    if limite_vertices is not None and tamanho > limite_vertices:
+        resultado["status"] = "ignorado"
+        return resultado
+
+    receptor, emissor = multiprocessing.Pipe(duplex=False)
+    processo = multiprocessing.Process(target=_executar_caso,
+                                       args=(emissor, familia, tamanho, operacao, repeticoes, aquecimento, semente))
+    processo.start()
+    emissor.close()
+    if receptor.poll(limite_tempo):
+        try:
+            resultado.update(receptor.recv())
+        except EOFError:
+            resultado["status"] = "erro"
+            resultado["erro"] = "O processo do caso terminou sem resultado."
+    else:
+        resultado["status"] = "tempo_esgotado"
+    if processo.is_alive():
+        processo.terminate()
+    processo.join()
+    receptor.close()
+
+    tempos = resultado.get("tempos")
+    if tempos:
+        resultado["minimo"] = min(tempos)
+        resultado["mediana"] = statistics.median(tempos)
+        resultado["media"] = statistics.fmean(tempos)
+    return resultado
+
+def executar(familias=None, tamanhos=(1000, 10000, 100000), operacoes=None, repeticoes=5, aquecimento=1,
+             limite_tempo=60.0, semente=0, exibir=True):
+    familias = list(familias or FAMILIAS)
+    operacoes = list(operacoes or OPERACOES)
+    for nome in familias:
+        if nome not in FAMILIAS:
+            raise ValueError(f"Família desconhecida: {nome!r}. Use uma de {tuple(FAMILIAS)}.")
+    for nome in operacoes:
+        if nome not in OPERACOES:
+            raise ValueError(f"Operação desconhecida: {nome!r}. Use uma de {tuple(OPERACOES)}.")
+    casos = []
+    for familia in familias:
+        for tamanho in tamanhos:
+            for operacao in operacoes:
+                resultado = medir_caso(familia, tamanho, operacao, repeticoes, aquecimento, limite_tempo, semente)
+                if resultado["status"] == "nao_aplicavel":
+                    continue
+                casos.append(resultado)
+                if exibir:
+                    print(_formatar_caso(resultado))
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parametros": {"repeticoes": repeticoes, "aquecimento": aquecimento, "limite_tempo": limite_tempo, "semente": semente},
+        "casos": casos,
+    }
+
+def _formatar_caso(resultado):
+    rotulo = f"{resultado['familia']:<20} {resultado['tamanho']:>8} {resultado['operacao']:<24}"
+    if resultado["status"] == "ok":
+        return f"{rotulo} {resultado['mediana']:>10.4f} s (mín {resultado['minimo']:.4f}, {resultado['arestas']} arestas)"
+    if resultado["status"] == "erro":
+        return f"{rotulo} erro: {resultado['erro']}"
+    return f"{rotulo} {resultado['status']}"
+
+def comparar(atual, base, tolerancia=0.10, minimo_absoluto=0.001):
+    referencia = {(c["familia"], c["tamanho"], c["operacao"]): c for c in base["casos"]}
+    comparacoes = []
+    for caso in atual["casos"]:
+        anterior = referencia.get((caso["familia"], caso["tamanho"], caso["operacao"]))
+        if anterior is None:
+            continue
+        item = {"familia": caso["familia"], "tamanho": caso["tamanho"], "operacao": caso["operacao"]}
+        if caso["status"] != "ok" or anterior["status"] != "ok":
+            item["situacao"] = "regressao" if anterior["status"] == "ok" else "sem_comparacao"
+            item["status"] = caso["status"]
+        else:
+            item["base"] = anterior["mediana"]
+            item["atual"] = caso["mediana"]
+            item["razao"] = caso["mediana"] / anterior["mediana"] if anterior["mediana"] else float("inf")
+            diferenca = caso["mediana"] - anterior["mediana"]
+            if diferenca > minimo_absoluto and item["razao"] > 1 + tolerancia:
+                item["situacao"] = "regressao"
+            elif -diferenca > minimo_absoluto and item["razao"] < 1 - tolerancia:
+                item["situacao"] = "melhora"
+            else:
+                item["situacao"] = "estavel"
+        comparacoes.append(item)
+    return comparacoes
+
+def _exibir_comparacao(comparacoes):
+    for item in comparacoes:
+        rotulo = f"{item['familia']:<20} {item['tamanho']:>8} {item['operacao']:<24}"
+        if "razao" in item:
+            print(f"{rotulo} {item['base']:>10.4f} -> {item['atual']:>10.4f} s ({item['razao']:.2f}x) {item['situacao']}")
+        else:
+            print(f"{rotulo} {item['situacao']} ({item['status']})")
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark das operações da classe Grafo.")
+    parser.add_argument("--familias", nargs="+", choices=list(FAMILIAS), help="famílias de grafos (padrão: todas)")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=[1000, 10000, 100000], help="números de vértices")
+    parser.add_argument("--operacoes", nargs="+", choices=list(OPERACOES), help="operações medidas (padrão: todas)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--aquecimento", type=int, default=1)
+    parser.add_argument("--limite-tempo", type=float, default=60.0, help="limite em segundos para cada caso")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados")
+    parser.add_argument("--comparar", help="arquivo JSON de base para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="aumento relativo aceito antes de acusar regressão")
+    args = parser.parse_args(argumentos)
+
+    resultados = executar(args.familias, args.tamanhos, args.operacoes, args.repeticoes, args.aquecimento,
+                          args.limite_tempo, args.semente)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        comparacoes = comparar(resultados, base, args.tolerancia)
+        print()
+        _exibir_comparacao(comparacoes)
+        if any(item["situacao"] == "regressao" for item in comparacoes):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
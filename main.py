@@ -1,29 +1,56 @@
+import contextlib
+import functools
+import json
+import math
+import mmap
 import os
+import struct
+import sys
+import tempfile
 import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from heapq import heappop, heappush
+from itertools import repeat
+from multiprocessing import shared_memory
+from operator import add, mul
+from xml.sax.saxutils import escape
+
+def _chave_aresta(u, v, dirigido):
+    if not dirigido and v < u:
+        return (v, u)
+    return (u, v)
 
 class ListaAdjacencia:
     def __init__(self, num_vertices, dirigido=False):
         self.num_vertices = num_vertices
         self.dirigido = dirigido
-        self.adjacencias = {i: [] for i in range(num_vertices)}
+        self.adjacencias = {i: {} for i in range(num_vertices)}
 
     def adicionar_aresta(self, u, v, peso=1, label=None):
         if not self.checar_adjacencia(u, v):
-            self.adjacencias[u].append((v, peso))
+            self.adjacencias[u][v] = peso
             if not self.dirigido:
-                self.adjacencias[v].append((u, peso))
+                self.adjacencias[v][u] = peso
 
     def remover_aresta(self, u, v):
-        self.adjacencias[u] = [w for w in self.adjacencias[u] if w[0] != v]
+        self.adjacencias[u].pop(v, None)
         if not self.dirigido:
-            self.adjacencias[v] = [w for w in self.adjacencias[v] if w[0] != u]
+            self.adjacencias[v].pop(u, None)
 
     def checar_adjacencia(self, u, v):
-        return any(w == v for w, _ in self.adjacencias[u])
+        return v in self.adjacencias[u]
+
+    def adicionar_vertice(self):
+        self.adjacencias[self.num_vertices] = {}
+        self.num_vertices += 1
 
     def exibir(self):
         for vertice, adj in self.adjacencias.items():
-            print(f"{vertice}: {adj}")
+            print(f"{vertice}: {list(adj.items())}")
 
 class MatrizAdjacencia:
     def __init__(self, num_vertices, dirigido=False):
@@ -44,111 +71,2286 @@ class MatrizAdjacencia:
     def checar_adjacencia(self, u, v):
         return self.adj_matrix[u][v] != 0
 
+    def definir(self, u, v, peso):
+        self.adj_matrix[u][v] = peso
+
+    def adicionar_vertice(self):
+        self.num_vertices += 1
+        for row in self.adj_matrix:
+            row.append(0)
+        self.adj_matrix.append([0] * self.num_vertices)
+
+    def linhas(self):
+        return iter(self.adj_matrix)
+
     def exibir(self):
         for row in self.adj_matrix:
             print(row)
 
-class MatrizIncidencia:
+class MatrizAdjacenciaCompacta:
+    # Sem pesos: um bit por célula. No primeiro peso diferente de 1 vira um vetor tipado contíguo
     def __init__(self, num_vertices, dirigido=False):
         self.num_vertices = num_vertices
         self.dirigido = dirigido
-        self.inc_matrix = []  
-        self.edge_list = []   
+        self.capacidade = num_vertices
+        self._bytes_linha = (num_vertices + 7) // 8
+        self.bits = bytearray(num_vertices * self._bytes_linha)
+        self.pesos = None
+
+    def _promover(self, peso):
+        if self.pesos is None:
+            capacidade = self.capacidade
+            pesos = array('i', [0]) * (capacidade * capacidade)
+            for u in range(self.num_vertices):
+                base = u * capacidade
+                for v in range(self.num_vertices):
+                    if self._tem_bit(u, v):
+                        pesos[base + v] = 1
+            self.pesos = pesos
+            self.bits = None
+        if isinstance(peso, float) and self.pesos.typecode != 'd':
+            self.pesos = array('d', self.pesos)
+        elif self.pesos.typecode == 'i' and not -2**31 <= peso < 2**31:
+            self.pesos = array('q', self.pesos)
+
+    def _tem_bit(self, u, v):
+        return self.bits[u * self._bytes_linha + (v >> 3)] >> (v & 7) & 1
+
+    def definir(self, u, v, peso):
+        if self.pesos is None and not isinstance(peso, float) and (peso == 0 or peso == 1):
+            i = u * self._bytes_linha + (v >> 3)
+            if peso:
+                self.bits[i] |= 1 << (v & 7)
+            else:
+                self.bits[i] &= ~(1 << (v & 7)) & 0xFF
+            return
+        self._promover(peso)
+        self.pesos[u * self.capacidade + v] = peso
 
-    def adicionar_aresta(self, u, v, peso=1, label=None):
-        self.edge_list.append({'u': u, 'v': v, 'peso': peso, 'label': label})
-        edge_index = len(self.edge_list) - 1
+    def adicionar_aresta(self, u, v, peso=1):
+        self.definir(u, v, peso)
+        if not self.dirigido:
+            self.definir(v, u, peso)
 
-        for row in self.inc_matrix:
-            row.append(0)
-        
-        nova_coluna = [0] * self.num_vertices
-        nova_coluna[u] = 1
+    def remover_aresta(self, u, v):
+        self.definir(u, v, 0)
         if not self.dirigido:
-            nova_coluna[v] = 1
+            self.definir(v, u, 0)
+
+    def checar_adjacencia(self, u, v):
+        if self.pesos is not None:
+            return self.pesos[u * self.capacidade + v] != 0
+        return bool(self._tem_bit(u, v))
+
+    def peso(self, u, v):
+        if self.pesos is not None:
+            return self.pesos[u * self.capacidade + v]
+        return self._tem_bit(u, v)
+
+    def adicionar_vertice(self):
+        if self.num_vertices == self.capacidade:
+            self._crescer(max(4, 2 * self.capacidade))
+        self.num_vertices += 1
+
+    def _crescer(self, capacidade):
+        # Crescimento geométrico: as linhas só são realocadas quando a capacidade dobra
+        n = self.num_vertices
+        if self.pesos is None:
+            antigo = self._bytes_linha
+            novo = (capacidade + 7) // 8
+            bits = bytearray(capacidade * novo)
+            for u in range(n):
+                bits[u * novo:u * novo + antigo] = self.bits[u * antigo:(u + 1) * antigo]
+            self.bits = bits
+            self._bytes_linha = novo
         else:
-            nova_coluna[v] = -1
-        self.inc_matrix.append(nova_coluna)
+            antiga = self.capacidade
+            pesos = array(self.pesos.typecode, [0]) * (capacidade * capacidade)
+            for u in range(n):
+                pesos[u * capacidade:u * capacidade + antiga] = self.pesos[u * antiga:(u + 1) * antiga]
+            self.pesos = pesos
+        self.capacidade = capacidade
+
+    def linha(self, u):
+        n = self.num_vertices
+        if self.pesos is not None:
+            base = u * self.capacidade
+            return self.pesos[base:base + n].tolist()
+        base = u * self._bytes_linha
+        return [self.bits[base + (v >> 3)] >> (v & 7) & 1 for v in range(n)]
+
+    def linhas(self):
+        return (self.linha(u) for u in range(self.num_vertices))
+
+    @property
+    def adj_matrix(self):
+        return list(self.linhas())
+
+    def exibir(self):
+        for row in self.linhas():
+            print(row)
+
+def _coluna_pesos(coluna, pesos):
+    if isinstance(coluna, list):
+        return coluna
+    if coluna.typecode == 'q' and all(type(peso) is int and -2**63 <= peso < 2**63 for peso in pesos):
+        return coluna
+    if (coluna.typecode == 'd' or not coluna) and all(type(peso) is float for peso in pesos):
+        return coluna if coluna.typecode == 'd' else array('d')
+    return coluna.tolist()
+
+class ArmazemArestas:
+    # Arestas em colunas: extremos e pesos em vetores tipados, rótulos internados numa tabela à parte.
+    # Pesos ficam em 'q' se todos forem inteiros e em 'd' se todos forem reais; qualquer mistura vira lista,
+    # para que cada peso volte exatamente como foi inserido.
+    # Remover só marca a posição como morta; o dono compacta quando as mortas passam das vivas
+    def __init__(self):
+        self.origens = array('q')
+        self.destinos = array('q')
+        self.pesos = array('q')
+        self.vivas = bytearray()
+        self.num_arestas = 0
+        self.rotulos = {}
+        self.tabela_rotulos = []
+        self._indice_rotulos = {}
+
+    def __len__(self):
+        return self.num_arestas
+
+    def _internar(self, label):
+        indice = self._indice_rotulos.get(label)
+        if indice is None:
+            indice = self._indice_rotulos[label] = len(self.tabela_rotulos)
+            self.tabela_rotulos.append(label)
+        return indice
+
+    def _aceitar_pesos(self, pesos):
+        # Escolhe a coluna antes de qualquer escrita, então a inserção seguinte não falha no meio
+        self.pesos = _coluna_pesos(self.pesos, pesos)
+
+    def adicionar(self, u, v, peso=1, label=None):
+        edge_id = len(self.vivas)
+        self._aceitar_pesos((peso,))
+        self.origens.append(u)
+        self.destinos.append(v)
+        self.pesos.append(peso)
+        self.vivas.append(1)
+        if label:
+            self.rotulos[edge_id] = self._internar(label)
+        self.num_arestas += 1
+        return edge_id
+
+    def adicionar_lote(self, pares, pesos, labels):
+        inicio = len(self.vivas)
+        origens = array('q', [u for u, _ in pares])
+        destinos = array('q', [v for _, v in pares])
+        self._aceitar_pesos(pesos)
+        self.origens.extend(origens)
+        self.destinos.extend(destinos)
+        self.pesos.extend(pesos)
+        self.vivas.extend(b"\x01" * len(pares))
+        for edge_id, label in enumerate(labels, inicio):
+            if label:
+                self.rotulos[edge_id] = self._internar(label)
+        self.num_arestas += len(pares)
+        return range(inicio, len(self.vivas))
+
+    def remover(self, edge_id):
+        self.vivas[edge_id] = 0
+        self.rotulos.pop(edge_id, None)
+        self.num_arestas -= 1
+
+    def rotulo(self, edge_id):
+        indice = self.rotulos.get(edge_id)
+        return None if indice is None else self.tabela_rotulos[indice]
+
+    def aresta(self, edge_id):
+        return self.origens[edge_id], self.destinos[edge_id], self.pesos[edge_id], self.rotulo(edge_id)
+
+    def como_dicionario(self, edge_id):
+        return {'u': self.origens[edge_id], 'v': self.destinos[edge_id], 'peso': self.pesos[edge_id], 'label': self.rotulo(edge_id)}
+
+    def ids(self):
+        if self.num_arestas == len(self.vivas):
+            return range(self.num_arestas)
+        return (edge_id for edge_id, viva in enumerate(self.vivas) if viva)
+
+    def extremos(self):
+        if self.num_arestas == len(self.vivas):
+            return zip(self.origens, self.destinos)
+        return ((self.origens[i], self.destinos[i]) for i in self.ids())
+
+    def itens(self):
+        rotulos, tabela = self.rotulos, self.tabela_rotulos
+        for edge_id in self.ids():
+            indice = rotulos.get(edge_id)
+            yield (self.origens[edge_id], self.destinos[edge_id], self.pesos[edge_id],
+                   None if indice is None else tabela[indice])
+
+    def edge_list(self):
+        return [{'u': u, 'v': v, 'peso': peso, 'label': label} for u, v, peso, label in self.itens()]
+
+    def precisa_compactar(self):
+        mortas = len(self.vivas) - self.num_arestas
+        return mortas > 1024 and mortas > self.num_arestas
+
+    def compactar(self):
+        # Renumera as arestas vivas em ordem; quem guarda ids precisa reindexar depois
+        ids = list(self.ids())
+        self.origens = array('q', map(self.origens.__getitem__, ids))
+        self.destinos = array('q', map(self.destinos.__getitem__, ids))
+        pesos = list(map(self.pesos.__getitem__, ids))
+        self.pesos = pesos if isinstance(self.pesos, list) else array(self.pesos.typecode, pesos)
+        self.rotulos = {novo: self.rotulos[antigo] for novo, antigo in enumerate(ids) if antigo in self.rotulos}
+        self.vivas = bytearray(b"\x01" * len(ids))
+
+class RotulosVertices(MutableMapping):
+    # Rótulos padrão "V1", "V2", ... gerados sob demanda; só os definidos explicitamente ficam guardados
+    def __init__(self, num_vertices=0):
+        self.num_vertices = num_vertices
+        self.definidos = {}
+
+    def _no_intervalo(self, v):
+        return isinstance(v, int) and 0 <= v < self.num_vertices
+
+    def __getitem__(self, v):
+        label = self.definidos.get(v)
+        if label is not None:
+            return label
+        if self._no_intervalo(v):
+            return f"V{v + 1}"
+        raise KeyError(v)
+
+    def __setitem__(self, v, label):
+        if self._no_intervalo(v) and label == f"V{v + 1}":
+            self.definidos.pop(v, None)
+        else:
+            self.definidos[v] = label
+
+    def __delitem__(self, v):
+        if v in self.definidos:
+            del self.definidos[v]
+        elif not self._no_intervalo(v):
+            raise KeyError(v)
+
+    def __contains__(self, v):
+        return self._no_intervalo(v) or v in self.definidos
+
+    def _extras(self):
+        return [v for v in self.definidos if not self._no_intervalo(v)]
+
+    def __iter__(self):
+        yield from range(self.num_vertices)
+        yield from self._extras()
+
+    def __len__(self):
+        return self.num_vertices + len(self._extras())
+
+class MatrizIncidencia:
+    def __init__(self, num_vertices, dirigido=False, armazem=None):
+        self.num_vertices = num_vertices
+        self.dirigido = dirigido
+        # Com o armazém do Grafo a matriz não duplica as arestas: só guarda o índice de incidência
+        self.armazem = armazem if armazem is not None else ArmazemArestas()
+        self._compartilhado = armazem is not None
+        self.incidentes = [{} for _ in range(num_vertices)]
+        self._ids_por_extremos = {}
+
+    @property
+    def edge_list(self):
+        return self.armazem.edge_list()
+
+    @property
+    def arestas(self):
+        return {edge_id: self.armazem.aresta(edge_id) for edge_id in self.armazem.ids()}
+
+    @property
+    def inc_matrix(self):
+        coluna = {edge_id: j for j, edge_id in enumerate(self.armazem.ids())}
+        matriz = [[0] * len(coluna) for _ in range(self.num_vertices)]
+        for vertice, incidentes in enumerate(self.incidentes):
+            row = matriz[vertice]
+            for edge_id, valor in incidentes.items():
+                row[coluna[edge_id]] = valor
+        return matriz
+
+    def indexar(self, edge_id, u, v):
+        self.incidentes[u][edge_id] = 1
+        self.incidentes[v][edge_id] = 1 if not self.dirigido else -1
+        self._ids_por_extremos.setdefault(_chave_aresta(u, v, self.dirigido), {})[edge_id] = None
+
+    def reindexar(self):
+        self.incidentes = [{} for _ in range(self.num_vertices)]
+        self._ids_por_extremos = {}
+        armazem = self.armazem
+        for edge_id in armazem.ids():
+            self.indexar(edge_id, armazem.origens[edge_id], armazem.destinos[edge_id])
+
+    def adicionar_aresta(self, u, v, peso=1, label=None):
+        edge_id = self.armazem.adicionar(u, v, peso, label)
+        self.indexar(edge_id, u, v)
+        return edge_id
 
     def remover_aresta(self, u, v):
-        for i, edge in enumerate(self.edge_list):
-            if edge['u'] == u and edge['v'] == v:
-                del self.edge_list[i]
-                del self.inc_matrix[i]
-                for row in self.inc_matrix:
-                    del row[i]
-                break
+        chave = _chave_aresta(u, v, self.dirigido)
+        ids = self._ids_por_extremos.get(chave)
+        if not ids:
+            return
+        edge_id = next(iter(ids))
+        del ids[edge_id]
+        if not ids:
+            del self._ids_por_extremos[chave]
+        armazem = self.armazem
+        origem, destino = armazem.origens[edge_id], armazem.destinos[edge_id]
+        del self.incidentes[origem][edge_id]
+        self.incidentes[destino].pop(edge_id, None)
+        if not self._compartilhado:
+            armazem.remover(edge_id)
+            if armazem.precisa_compactar():
+                armazem.compactar()
+                self.reindexar()
 
     def checar_adjacencia(self, u, v):
-        for edge in self.edge_list:
-            if edge['u'] == u and edge['v'] == v:
-                return True
-            if not self.dirigido and edge['u'] == v and edge['v'] == u:
-                return True
-        return False
+        return _chave_aresta(u, v, self.dirigido) in self._ids_por_extremos
+
+    def arestas_incidentes(self, v):
+        return [self.armazem.aresta(edge_id) for edge_id in self.incidentes[v]]
+
+    def adicionar_vertice(self):
+        self.num_vertices += 1
+        self.incidentes.append({})
 
     def exibir(self):
         print("Matriz de Incidência:")
         for row in self.inc_matrix:
             print(row)
 
+def _como_lista(valores):
+    if hasattr(valores, "tolist"):
+        return valores.tolist()
+    return list(valores)
+
+def _converter_peso(campo):
+    try:
+        return int(campo)
+    except ValueError:
+        return float(campo)
+
+def _converter_pesos(campos):
+    # Cada campo mantém o próprio tipo: "5" continua inteiro mesmo num bloco com "2.5"
+    try:
+        return list(map(int, campos))
+    except ValueError:
+        return list(map(_converter_peso, campos))
+
+class _AcumuladorArestas:
+    def __init__(self):
+        self.origens = array('q')
+        self.destinos = array('q')
+        self.pesos = None
+        self.labels = {}
+
+    def adicionar(self, origens, destinos, pesos=None, labels=None):
+        inicio = len(self.origens)
+        self.origens.extend(origens)
+        self.destinos.extend(destinos)
+        quantidade = len(self.origens) - inicio
+        if len(self.destinos) != len(self.origens):
+            raise ValueError("Cada aresta da lista deve ter origem e destino.")
+        if pesos is not None:
+            if self.pesos is None:
+                self.pesos = array('q', [1]) * inicio
+            self.pesos = _coluna_pesos(self.pesos, pesos)
+            self.pesos.extend(pesos)
+        elif self.pesos is not None:
+            self.pesos = _coluna_pesos(self.pesos, (1,))
+            self.pesos.extend(repeat(1, quantidade))
+        if labels is not None:
+            for i, label in enumerate(labels, inicio):
+                if label:
+                    self.labels[i] = label
+
+    def ler_bloco(self, bloco):
+        bloco = bloco.replace(b",", b" ")
+        linhas = bloco.splitlines()
+        # O caminho vetorizado exige o mesmo número de campos em todas as linhas não vazias
+        larguras = set(map(len, map(bytes.split, linhas)))
+        larguras.discard(0)
+        if not larguras:
+            return
+        colunas = larguras.pop()
+        if b"#" in bloco or larguras or colunas not in (2, 3, 4):
+            self._ler_linhas(linhas)
+            return
+        campos = bloco.split()
+        pesos = _converter_pesos(campos[2::colunas]) if colunas >= 3 else None
+        labels = [label.decode("utf-8") for label in campos[3::colunas]] if colunas == 4 else None
+        self.adicionar(map(int, campos[0::colunas]), map(int, campos[1::colunas]), pesos, labels)
+
+    def _ler_linhas(self, linhas):
+        origens = []
+        destinos = []
+        pesos = []
+        labels = []
+        for numero, linha in enumerate(linhas, 1):
+            linha = linha.split(b"#", 1)[0].strip()
+            if not linha:
+                continue
+            partes = linha.split(None, 3)
+            if len(partes) < 2:
+                raise ValueError(f"Linha inválida na lista de arestas: {linha.decode('utf-8', 'replace')!r}")
+            origens.append(int(partes[0]))
+            destinos.append(int(partes[1]))
+            pesos.append(_converter_pesos(partes[2:3])[0] if len(partes) > 2 else 1)
+            labels.append(partes[3].decode("utf-8") if len(partes) > 3 else None)
+        tem_pesos = self.pesos is not None or any(type(peso) is not int or peso != 1 for peso in pesos)
+        self.adicionar(origens, destinos, pesos if tem_pesos else None, labels)
+
+    def lista_labels(self):
+        if not self.labels:
+            return None
+        labels = [None] * len(self.origens)
+        for i, label in self.labels.items():
+            labels[i] = label
+        return labels
+
+def ler_lista_arestas(caminho, tamanho_bloco=1 << 24):
+    acumulador = _AcumuladorArestas()
+    with open(caminho, "rb") as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        if tamanho == 0:
+            return acumulador
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            inicio = 0
+            while inicio < tamanho:
+                fim = min(inicio + tamanho_bloco, tamanho)
+                if fim < tamanho:
+                    quebra = mapa.rfind(b"\n", inicio, fim)
+                    if quebra == -1:
+                        quebra = mapa.find(b"\n", fim)
+                    fim = tamanho if quebra == -1 else quebra + 1
+                acumulador.ler_bloco(mapa[inicio:fim])
+                inicio = fim
+    return acumulador
+
+def _escapar_atributo(valor):
+    return escape(str(valor), {'"': "&quot;"})
+
+def _tag_local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+def ler_gexf(caminho, arestas_por_lote=65536):
+    acumulador = _AcumuladorArestas()
+    indices = {}
+    rotulos_vertices = {}
+    tags = {}
+    dirigido = False
+    pai = None
+    origens = []
+    destinos = []
+    pesos = []
+    labels = []
+    for evento, elemento in ET.iterparse(caminho, events=("start", "end")):
+        tag = tags.get(elemento.tag)
+        if tag is None:
+            tag = tags[elemento.tag] = _tag_local(elemento.tag)
+        if evento == "start":
+            if tag == "graph":
+                dirigido = elemento.get("defaultedgetype", "undirected") == "directed"
+            elif tag in ("nodes", "edges"):
+                pai = elemento
+            continue
+        if tag == "edge":
+            origens.append(indices.setdefault(elemento.get("source"), len(indices)))
+            destinos.append(indices.setdefault(elemento.get("target"), len(indices)))
+            pesos.append(elemento.get("weight", "1"))
+            labels.append(elemento.get("label"))
+            if len(origens) >= arestas_por_lote:
+                _descarregar_lote_gexf(acumulador, origens, destinos, pesos, labels)
+        elif tag == "node":
+            v = indices.setdefault(elemento.get("id"), len(indices))
+            label = elemento.get("label")
+            if label is not None and label != f"V{v + 1}":
+                rotulos_vertices[v] = label
+        else:
+            continue
+        elemento.clear()
+        if pai is not None and len(pai):
+            pai.remove(elemento)
+    _descarregar_lote_gexf(acumulador, origens, destinos, pesos, labels)
+    return acumulador, len(indices), dirigido, rotulos_vertices
+
+def _descarregar_lote_gexf(acumulador, origens, destinos, pesos, labels):
+    if not origens:
+        return
+    pesos_convertidos = _converter_pesos(pesos)
+    tem_pesos = acumulador.pesos is not None or any(type(peso) is not int or peso != 1 for peso in pesos_convertidos)
+    acumulador.adicionar(origens, destinos, pesos_convertidos if tem_pesos else None, labels)
+    origens.clear()
+    destinos.clear()
+    pesos.clear()
+    labels.clear()
+
+def _typecode(vetor):
+    return vetor.typecode if isinstance(vetor, array) else vetor.format
+
+def _typecode_indices(num_vertices):
+    return 'i' if num_vertices <= 2 ** 31 - 1 else 'q'
+
+def _pesos_csr(valores, coluna):
+    # Segue a coluna do armazém: mistura de tipos, inteiros fora de 64 bits ou pesos não numéricos ficam numa lista comum
+    if isinstance(coluna, list):
+        return valores
+    return array(coluna.typecode, valores)
+
+FORMATO_SNAPSHOT = b"OLAAGRF\0"
+VERSAO_SNAPSHOT = 1
+_CABECALHO_SNAPSHOT = struct.Struct("<8sIIQQQ")
+_FLAG_DIRIGIDO = 1
+_FLAG_PESOS_REAIS = 2
+_FLAG_INDICES_64 = 4
+_FLAG_BIG_ENDIAN = 8
+_FLAG_PESOS_TABELA = 16
+
+def _alinhar(posicao):
+    return (posicao + 7) & ~7
+
+def _escrever_snapshot(caminho, csr, rotulos):
+    flags = 0
+    pesos = csr.pesos
+    if isinstance(pesos, list):
+        # Coluna mista ou fora de 64 bits: o JSON guarda cada peso com o tipo exato
+        if not all(type(peso) in (int, float, str, bool) for peso in pesos):
+            raise ValueError("O snapshot só guarda pesos numéricos, booleanos ou textuais.")
+        rotulos = dict(rotulos, pesos=pesos)
+        pesos = b""
+        flags |= _FLAG_PESOS_TABELA
+    elif _typecode(pesos) == 'd':
+        flags |= _FLAG_PESOS_REAIS
+    if csr.dirigido:
+        flags |= _FLAG_DIRIGIDO
+    tabela = json.dumps(rotulos, ensure_ascii=False).encode("utf-8")
+    if csr.destinos.itemsize == 8:
+        flags |= _FLAG_INDICES_64
+    if sys.byteorder == "big":
+        flags |= _FLAG_BIG_ENDIAN
+    # Temporário + os.replace: um snapshot ainda mapeado por load continua apontando para o arquivo antigo
+    with _arquivo_atomico(caminho, "wb") as arquivo:
+        arquivo.write(_CABECALHO_SNAPSHOT.pack(FORMATO_SNAPSHOT, VERSAO_SNAPSHOT, flags, csr.num_vertices, csr.num_arcos(), len(tabela)))
+        for secao in (csr.offsets, csr.destinos, pesos, tabela):
+            arquivo.write(secao)
+            arquivo.write(bytes(_alinhar(arquivo.tell()) - arquivo.tell()))
+
+def _ler_snapshot(caminho, usar_mmap=True):
+    with open(caminho, "rb") as arquivo:
+        if usar_mmap:
+            dados = memoryview(mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            dados = memoryview(arquivo.read())
+    if len(dados) < _CABECALHO_SNAPSHOT.size:
+        raise ValueError(f"Arquivo não é um snapshot de grafo: {caminho}")
+    formato, versao, flags, n, num_arcos, tamanho_tabela = _CABECALHO_SNAPSHOT.unpack_from(dados)
+    if formato != FORMATO_SNAPSHOT:
+        raise ValueError(f"Arquivo não é um snapshot de grafo: {caminho}")
+    if versao != VERSAO_SNAPSHOT:
+        raise ValueError(f"Versão de snapshot não suportada: {versao} (esperada {VERSAO_SNAPSHOT}).")
+    trocar_bytes = bool(flags & _FLAG_BIG_ENDIAN) != (sys.byteorder == "big")
+    secoes = []
+    posicao = _CABECALHO_SNAPSHOT.size
+    for typecode, quantidade in (('q', n + 1),
+                                 ('q' if flags & _FLAG_INDICES_64 else 'i', num_arcos),
+                                 ('d' if flags & _FLAG_PESOS_REAIS else 'q', 0 if flags & _FLAG_PESOS_TABELA else num_arcos)):
+        tamanho = quantidade * array(typecode).itemsize
+        if posicao + tamanho > len(dados):
+            raise ValueError(f"Snapshot truncado: {caminho}")
+        secao = dados[posicao:posicao + tamanho]
+        if trocar_bytes:
+            copia = array(typecode, secao.tobytes())
+            copia.byteswap()
+            secoes.append(copia)
+        else:
+            secoes.append(secao.cast(typecode))
+        posicao = _alinhar(posicao + tamanho)
+    rotulos = json.loads(bytes(dados[posicao:posicao + tamanho_tabela]).decode("utf-8"))
+    offsets, destinos, pesos = secoes
+    if flags & _FLAG_PESOS_TABELA:
+        pesos = rotulos.pop("pesos")
+    csr = GrafoCSR(n, bool(flags & _FLAG_DIRIGIDO), offsets, destinos, pesos, rotulos.get("nome", ""))
+    csr.rotulos = rotulos
+    return csr
+
+_ANALISES_POR_COMPONENTE = {
+    "pontes": "identificar_pontes_tarjan",
+    "articulacoes": "identificar_articulacoes",
+    "scc": "kosaraju_scc",
+}
+_ESTADO_TRABALHADOR = None
+
+def _dividir_componentes(offsets_componentes, num_lotes):
+    num_componentes = len(offsets_componentes) - 1
+    alvo = max(1, offsets_componentes[num_componentes] // max(1, num_lotes))
+    limites = [0]
+    for c in range(1, num_componentes + 1):
+        if offsets_componentes[c] - offsets_componentes[limites[-1]] >= alvo:
+            limites.append(c)
+    if limites[-1] != num_componentes:
+        limites.append(num_componentes)
+    return list(zip(limites[:-1], limites[1:]))
+
+def _copiar_para_memoria_compartilhada(vetores):
+    layout = []
+    posicao = 0
+    for vetor in vetores:
+        layout.append((_typecode(vetor), posicao, len(vetor)))
+        posicao = _alinhar(posicao + len(vetor) * vetor.itemsize)
+    memoria = shared_memory.SharedMemory(create=True, size=max(posicao, 1))
+    for vetor, (_, inicio, _) in zip(vetores, layout):
+        bruto = memoryview(vetor).cast('B')
+        memoria.buf[inicio:inicio + len(bruto)] = bruto
+    return memoria, layout
+
+def _abrir_memoria_compartilhada(nome, layout):
+    memoria = shared_memory.SharedMemory(name=nome)
+    vetores = []
+    for typecode, inicio, quantidade in layout:
+        tamanho = quantidade * array(typecode).itemsize
+        vetores.append(memoria.buf[inicio:inicio + tamanho].cast(typecode))
+    return memoria, vetores
+
+def _iniciar_trabalhador_componentes(nome, layout, num_vertices, dirigido):
+    global _ESTADO_TRABALHADOR
+    if nome is None:
+        memoria, vetores = None, layout
+    else:
+        memoria, vetores = _abrir_memoria_compartilhada(nome, layout)
+    csr = GrafoCSR(num_vertices, dirigido, vetores[0], vetores[1], array('q'))
+    if dirigido:
+        transposto = GrafoCSR(num_vertices, True, vetores[4], vetores[5], array('q'))
+        csr._transposto = transposto
+        transposto._transposto = csr
+    _ESTADO_TRABALHADOR = (memoria, csr, vetores[2], vetores[3])
+
+def _limpar_trabalhador():
+    global _ESTADO_TRABALHADOR
+    _ESTADO_TRABALHADOR = None
+
+def _analisar_lote_componentes(inicio, fim, analises):
+    _, csr, offsets_componentes, vertices = _ESTADO_TRABALHADOR
+    raizes = vertices[offsets_componentes[inicio]:offsets_componentes[fim]]
+    return {analise: getattr(csr, _ANALISES_POR_COMPONENTE[analise])(raizes) for analise in analises}
+
+def _iniciar_trabalhador_caminhos(nome, layout, num_vertices, dirigido):
+    global _ESTADO_TRABALHADOR
+    if nome is None:
+        memoria, vetores = None, layout
+    else:
+        memoria, vetores = _abrir_memoria_compartilhada(nome, layout)
+    csr = GrafoCSR(num_vertices, dirigido, vetores[0], vetores[1], vetores[2])
+    csr._pesos_validados = True
+    _ESTADO_TRABALHADOR = (memoria, csr)
+
+def _distancias_lote(origens):
+    csr = _ESTADO_TRABALHADOR[1]
+    return [csr.dijkstra(origem)[0] for origem in origens]
+
+class GrafoCSR:
+    def __init__(self, num_vertices, dirigido, offsets, destinos, pesos, nome=""):
+        self.num_vertices = num_vertices
+        self.dirigido = dirigido
+        self.nome = nome
+        self.offsets = offsets
+        self.destinos = destinos
+        self.pesos = pesos
+        self.rotulos = None
+        self._transposto = None
+        self._componentes_fortes = None
+        self._condensacao = None
+        self._arvore_blocos = None
+        self._pesos_validados = False
+        self._fecho = None
+
+    def save(self, caminho):
+        rotulos = self.rotulos if self.rotulos is not None else {"nome": self.nome}
+        _escrever_snapshot(caminho, self, rotulos)
+
+    @classmethod
+    def load(cls, caminho, mmap=True):
+        return _ler_snapshot(caminho, mmap)
+
+    def arestas(self):
+        offsets, destinos, pesos = self.offsets, self.destinos, self.pesos
+        origens_arestas = []
+        destinos_arestas = []
+        pesos_arestas = []
+        for u in range(self.num_vertices):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = destinos[i]
+                if self.dirigido or u <= v:
+                    origens_arestas.append(u)
+                    destinos_arestas.append(v)
+                    pesos_arestas.append(pesos[i])
+        return origens_arestas, destinos_arestas, pesos_arestas
+
+    @classmethod
+    def de_grafo(cls, grafo):
+        n = grafo.num_vertices
+        adjacencias = grafo.lista_adj.adjacencias
+        offsets = array('q', bytes(8 * (n + 1)))
+        destinos = array(_typecode_indices(n))
+        pesos = []
+        for u in range(n):
+            adj = adjacencias[u]
+            destinos.extend(adj)
+            pesos.extend(adj.values())
+            offsets[u + 1] = len(destinos)
+        return cls(n, grafo.dirigido, offsets, destinos, _pesos_csr(pesos, grafo._armazem.pesos), grafo.nome)
+
+    def num_arcos(self):
+        return len(self.destinos)
+
+    def grau(self, v):
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def vizinhos(self, v):
+        return self.destinos[self.offsets[v]:self.offsets[v + 1]]
+
+    def transposto(self):
+        if not self.dirigido:
+            return self
+        if self._transposto is not None:
+            return self._transposto
+        n = self.num_vertices
+        offsets, destinos, pesos = self.offsets, self.destinos, self.pesos
+        m = len(destinos)
+        offsets_t = array('q', bytes(8 * (n + 1)))
+        for w in destinos:
+            offsets_t[w + 1] += 1
+        for v in range(n):
+            offsets_t[v + 1] += offsets_t[v]
+        destinos_t = array(_typecode(destinos), bytes(destinos.itemsize * m))
+        pesos_t = [None] * m if isinstance(pesos, list) else array(_typecode(pesos), bytes(pesos.itemsize * m))
+        posicao = offsets_t[:n]
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                w = destinos[i]
+                j = posicao[w]
+                destinos_t[j] = u
+                pesos_t[j] = pesos[i]
+                posicao[w] = j + 1
+        self._transposto = GrafoCSR(n, True, offsets_t, destinos_t, pesos_t, self.nome)
+        self._transposto._transposto = self
+        return self._transposto
+
+    def rotular_componentes(self):
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        transposto = self.transposto() if self.dirigido else None
+        rotulos = array('q', [-1]) * n
+        num_componentes = 0
+        for raiz in range(n):
+            if rotulos[raiz] != -1:
+                continue
+            rotulos[raiz] = num_componentes
+            pilha = [raiz]
+            while pilha:
+                v = pilha.pop()
+                for w in destinos[offsets[v]:offsets[v + 1]]:
+                    if rotulos[w] == -1:
+                        rotulos[w] = num_componentes
+                        pilha.append(w)
+                if transposto is not None:
+                    for w in transposto.destinos[transposto.offsets[v]:transposto.offsets[v + 1]]:
+                        if rotulos[w] == -1:
+                            rotulos[w] = num_componentes
+                            pilha.append(w)
+            num_componentes += 1
+
+        offsets_componentes = array('q', bytes(8 * (num_componentes + 1)))
+        for c in rotulos:
+            offsets_componentes[c + 1] += 1
+        for c in range(num_componentes):
+            offsets_componentes[c + 1] += offsets_componentes[c]
+        vertices = array('q', bytes(8 * n))
+        posicao = list(offsets_componentes[:num_componentes])
+        for v in range(n):
+            c = rotulos[v]
+            vertices[posicao[c]] = v
+            posicao[c] += 1
+        return num_componentes, rotulos, offsets_componentes, vertices
+
+    def analisar_componentes_paralelo(self, analises=("pontes", "articulacoes", "scc"), processos=None):
+        for analise in analises:
+            if analise not in _ANALISES_POR_COMPONENTE:
+                raise ValueError(f"Análise desconhecida: {analise!r}. Use uma de {tuple(_ANALISES_POR_COMPONENTE)}.")
+        analises = tuple(analises)
+        processos = processos or os.cpu_count() or 1
+        _, _, offsets_componentes, vertices = self.rotular_componentes()
+        lotes = _dividir_componentes(offsets_componentes, 4 * processos)
+        inicios = [inicio for inicio, _ in lotes]
+        fins = [fim for _, fim in lotes]
+        vetores = [self.offsets, self.destinos, offsets_componentes, vertices]
+        if self.dirigido:
+            transposto = self.transposto()
+            vetores += [transposto.offsets, transposto.destinos]
+
+        if processos == 1 or len(lotes) <= 1:
+            _iniciar_trabalhador_componentes(None, vetores, self.num_vertices, self.dirigido)
+            try:
+                parciais = list(map(_analisar_lote_componentes, inicios, fins, repeat(analises)))
+            finally:
+                _limpar_trabalhador()
+        else:
+            memoria, layout = _copiar_para_memoria_compartilhada(vetores)
+            try:
+                with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador_componentes,
+                                         initargs=(memoria.name, layout, self.num_vertices, self.dirigido)) as executor:
+                    parciais = list(executor.map(_analisar_lote_componentes, inicios, fins, repeat(analises)))
+            finally:
+                memoria.close()
+                memoria.unlink()
+
+        resultado = {}
+        for analise in analises:
+            combinado = []
+            for parcial in parciais:
+                combinado.extend(parcial[analise])
+            if analise == "articulacoes":
+                combinado.sort()
+            resultado[analise] = combinado
+        return resultado
+
+    def grafo_conexo(self):
+        n = self.num_vertices
+        if n == 0:
+            return True
+        offsets, destinos = self.offsets, self.destinos
+        visitados = bytearray(n)
+        visitados[0] = 1
+        alcancados = 1
+        pilha = [0]
+        while pilha:
+            v = pilha.pop()
+            for w in destinos[offsets[v]:offsets[v + 1]]:
+                if not visitados[w]:
+                    visitados[w] = 1
+                    alcancados += 1
+                    pilha.append(w)
+        return alcancados == n
+
+    def identificar_pontes_tarjan(self, raizes=None):
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        num = [0] * n
+        low = [0] * n
+        parent = [-1] * n
+        proximo = list(offsets[:n])
+        tempo = 1
+        pontes = []
+        for raiz in range(n) if raizes is None else raizes:
+            if num[raiz]:
+                continue
+            num[raiz] = low[raiz] = tempo
+            tempo += 1
+            stack = [raiz]
+            while stack:
+                v = stack[-1]
+                i = proximo[v]
+                if i < offsets[v + 1]:
+                    proximo[v] = i + 1
+                    w = destinos[i]
+                    if not num[w]:
+                        parent[w] = v
+                        num[w] = low[w] = tempo
+                        tempo += 1
+                        stack.append(w)
+                    elif w != parent[v] and num[w] < low[v]:
+                        low[v] = num[w]
+                else:
+                    stack.pop()
+                    p = parent[v]
+                    if p != -1:
+                        if low[v] < low[p]:
+                            low[p] = low[v]
+                        if low[v] > num[p]:
+                            pontes.append((p, v))
+        return pontes
+
+    def identificar_articulacoes(self, raizes=None):
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        num = [0] * n
+        low = [0] * n
+        parent = [-1] * n
+        proximo = list(offsets[:n])
+        articulacao = bytearray(n)
+        tempo = 1
+        for raiz in range(n) if raizes is None else raizes:
+            if num[raiz]:
+                continue
+            num[raiz] = low[raiz] = tempo
+            tempo += 1
+            filhos_raiz = 0
+            stack = [raiz]
+            while stack:
+                v = stack[-1]
+                i = proximo[v]
+                if i < offsets[v + 1]:
+                    proximo[v] = i + 1
+                    w = destinos[i]
+                    if not num[w]:
+                        parent[w] = v
+                        if v == raiz:
+                            filhos_raiz += 1
+                        num[w] = low[w] = tempo
+                        tempo += 1
+                        stack.append(w)
+                    elif w != parent[v] and num[w] < low[v]:
+                        low[v] = num[w]
+                else:
+                    stack.pop()
+                    p = parent[v]
+                    if p != -1:
+                        if low[v] < low[p]:
+                            low[p] = low[v]
+                        if p != raiz and low[v] >= num[p]:
+                            articulacao[p] = 1
+            if filhos_raiz > 1:
+                articulacao[raiz] = 1
+        if raizes is None:
+            return [v for v in range(n) if articulacao[v]]
+        return [v for v in raizes if articulacao[v]]
+
+    def kosaraju_scc(self, raizes=None):
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        visitados = bytearray(n)
+        proximo = list(offsets[:n])
+        ordem = []
+        for raiz in range(n) if raizes is None else raizes:
+            if visitados[raiz]:
+                continue
+            visitados[raiz] = 1
+            stack = [raiz]
+            while stack:
+                v = stack[-1]
+                i = proximo[v]
+                if i < offsets[v + 1]:
+                    proximo[v] = i + 1
+                    w = destinos[i]
+                    if not visitados[w]:
+                        visitados[w] = 1
+                        stack.append(w)
+                else:
+                    stack.pop()
+                    ordem.append(v)
+
+        transposto = self.transposto()
+        offsets_t, destinos_t = transposto.offsets, transposto.destinos
+        visitados = bytearray(n)
+        scc_list = []
+        while ordem:
+            v = ordem.pop()
+            if visitados[v]:
+                continue
+            visitados[v] = 1
+            component = []
+            stack = [v]
+            while stack:
+                x = stack.pop()
+                component.append(x)
+                for w in destinos_t[offsets_t[x]:offsets_t[x + 1]]:
+                    if not visitados[w]:
+                        visitados[w] = 1
+                        stack.append(w)
+            scc_list.append(component)
+        return scc_list
+
+    def componentes_fortes(self):
+        if self._componentes_fortes is not None:
+            return self._componentes_fortes
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        indice = [-1] * n
+        baixo = [0] * n
+        componente = [-1] * n
+        proximo = list(offsets[:n])
+        pilha_scc = []
+        contador = 0
+        num_componentes = 0
+        # Tarjan iterativo: um vértice visitado e ainda sem componente está na pilha
+        for raiz in range(n):
+            if indice[raiz] != -1:
+                continue
+            indice[raiz] = baixo[raiz] = contador
+            contador += 1
+            pilha_scc.append(raiz)
+            chamadas = [raiz]
+            while chamadas:
+                v = chamadas[-1]
+                i = proximo[v]
+                if i < offsets[v + 1]:
+                    proximo[v] = i + 1
+                    w = destinos[i]
+                    if indice[w] == -1:
+                        indice[w] = baixo[w] = contador
+                        contador += 1
+                        pilha_scc.append(w)
+                        chamadas.append(w)
+                    elif componente[w] == -1 and indice[w] < baixo[v]:
+                        baixo[v] = indice[w]
+                else:
+                    chamadas.pop()
+                    if chamadas and baixo[v] < baixo[chamadas[-1]]:
+                        baixo[chamadas[-1]] = baixo[v]
+                    if baixo[v] == indice[v]:
+                        while True:
+                            w = pilha_scc.pop()
+                            componente[w] = num_componentes
+                            if w == v:
+                                break
+                        num_componentes += 1
+        # Tarjan fecha os componentes em ordem topológica reversa; os ids são invertidos para seguir a ordem topológica
+        ultimo = num_componentes - 1
+        self._componentes_fortes = (num_componentes, array('q', [ultimo - c for c in componente]))
+        return self._componentes_fortes
+
+    def condensacao(self):
+        if self._condensacao is not None:
+            return self._condensacao
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        num_componentes, componente = self.componentes_fortes()
+        tamanhos = array('q', bytes(8 * num_componentes))
+        for c in componente:
+            tamanhos[c] += 1
+        inicio = 0
+        posicao = []
+        for tamanho in tamanhos:
+            posicao.append(inicio)
+            inicio += tamanho
+        membros = array('q', bytes(8 * n))
+        for v in range(n):
+            c = componente[v]
+            membros[posicao[c]] = v
+            posicao[c] += 1
+
+        offsets_dag = array('q', bytes(8 * (num_componentes + 1)))
+        destinos_dag = array(_typecode_indices(num_componentes))
+        marca = [-1] * num_componentes
+        inicio = 0
+        for c in range(num_componentes):
+            marca[c] = c
+            fim = inicio + tamanhos[c]
+            for v in membros[inicio:fim]:
+                for w in destinos[offsets[v]:offsets[v + 1]]:
+                    d = componente[w]
+                    if marca[d] != c:
+                        marca[d] = c
+                        destinos_dag.append(d)
+            offsets_dag[c + 1] = len(destinos_dag)
+            inicio = fim
+        dag = GrafoCSR(num_componentes, True, offsets_dag, destinos_dag, array('q', [1]) * len(destinos_dag), self.nome)
+        self._condensacao = (dag, tamanhos)
+        return self._condensacao
+
+    def arvore_blocos_corte(self):
+        if self.dirigido:
+            raise ValueError("A árvore de blocos e articulações só se aplica a grafos não direcionados.")
+        if self._arvore_blocos is None:
+            self._arvore_blocos = ArvoreBlocosCorte(self)
+        return self._arvore_blocos
+
+    def _ids_arestas(self):
+        # Cada aresta não direcionada aparece como dois arcos; os dois recebem o mesmo id
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        ids = array('q', bytes(8 * len(destinos)))
+        pendentes = {}
+        proximo_id = 0
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = destinos[i]
+                if u < v:
+                    ids[i] = pendentes[u * n + v] = proximo_id
+                    proximo_id += 1
+                elif u == v:
+                    ids[i] = proximo_id
+                    proximo_id += 1
+                else:
+                    ids[i] = pendentes.pop(v * n + u)
+        return ids, proximo_id
+
+    def _extremos_euleriano(self):
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        com_arestas = [v for v in range(n) if offsets[v + 1] > offsets[v]]
+        inicio = 0 if not com_arestas or offsets[1] > offsets[0] else com_arestas[0]
+        if self.dirigido:
+            saldo = [offsets[v + 1] - offsets[v] for v in range(n)]
+            for w in destinos:
+                saldo[w] -= 1
+            desbalanceados = [v for v in range(n) if saldo[v]]
+            if not desbalanceados:
+                return inicio, True
+            if len(desbalanceados) == 2 and sorted(saldo[v] for v in desbalanceados) == [-1, 1]:
+                return (desbalanceados[0] if saldo[desbalanceados[0]] == 1 else desbalanceados[1]), False
+            return None
+        # Laços aparecem uma única vez na lista do vértice e não alteram a paridade do grau
+        impares = [v for v in com_arestas
+                   if (offsets[v + 1] - offsets[v] - sum(1 for w in destinos[offsets[v]:offsets[v + 1]] if w == v)) % 2]
+        if not impares:
+            return inicio, True
+        if len(impares) == 2:
+            return impares[0], False
+        return None
+
+    def tipo_euleriano(self):
+        extremos = self._extremos_euleriano()
+        if extremos is None:
+            return None
+        offsets = self.offsets
+        _, rotulos, _, _ = self.rotular_componentes()
+        componentes = {rotulos[v] for v in range(self.num_vertices) if offsets[v + 1] > offsets[v]}
+        if len(componentes) > 1:
+            return None
+        return "circuito" if extremos[1] else "caminho"
+
+    def hierholzer(self):
+        extremos = self._extremos_euleriano()
+        if extremos is None:
+            return None
+        inicio = extremos[0]
+        n = self.num_vertices
+        offsets, destinos = self.offsets, self.destinos
+        if self.dirigido:
+            ids = None
+            m = len(destinos)
+        else:
+            ids, m = self._ids_arestas()
+            usado = bytearray(m)
+        if n == 0:
+            return []
+        proximo = list(offsets[:n])
+        pilha = [inicio]
+        trilha = []
+        while pilha:
+            v = pilha[-1]
+            i = proximo[v]
+            fim = offsets[v + 1]
+            if ids is not None:
+                while i < fim and usado[ids[i]]:
+                    i += 1
+            if i < fim:
+                proximo[v] = i + 1
+                if ids is not None:
+                    usado[ids[i]] = 1
+                pilha.append(destinos[i])
+            else:
+                proximo[v] = i
+                pilha.pop()
+                if pilha:
+                    trilha.append((pilha[-1], v))
+        if len(trilha) != m:
+            # Sobraram arestas em outro componente: não há trilha euleriana
+            return None
+        trilha.reverse()
+        return trilha
+
+    def fecho_transitivo(self):
+        if self._fecho is None:
+            self._fecho = FechoTransitivo(self)
+        return self._fecho
+
+    def _validar_pesos(self):
+        if not self._pesos_validados:
+            try:
+                negativo = len(self.pesos) and min(self.pesos) < 0
+            except TypeError:
+                raise ValueError("O algoritmo de Dijkstra exige pesos numéricos.") from None
+            if negativo:
+                raise ValueError("O algoritmo de Dijkstra não aceita arestas com peso negativo.")
+            self._pesos_validados = True
+
+    def dijkstra(self, origem, destino=None):
+        self._validar_pesos()
+        n = self.num_vertices
+        offsets, destinos, pesos = self.offsets, self.destinos, self.pesos
+        distancia = array('d', [math.inf]) * n
+        anterior = array('q', [-1]) * n
+        distancia[origem] = 0.0
+        fila = [(0.0, origem)]
+        while fila:
+            d, v = heappop(fila)
+            if d > distancia[v]:
+                continue
+            if v == destino:
+                break
+            inicio, fim = offsets[v], offsets[v + 1]
+            for w, peso in zip(destinos[inicio:fim], pesos[inicio:fim]):
+                nova = d + peso
+                if nova < distancia[w]:
+                    distancia[w] = nova
+                    anterior[w] = v
+                    heappush(fila, (nova, w))
+        return distancia, anterior
+
+    def caminho_minimo(self, origem, destino):
+        distancia, anterior = self.dijkstra(origem, destino)
+        if distancia[destino] == math.inf:
+            return math.inf, []
+        caminho = [destino]
+        while caminho[-1] != origem:
+            caminho.append(anterior[caminho[-1]])
+        caminho.reverse()
+        return distancia[destino], caminho
+
+    def distancias_lote(self, origens=None, processos=None):
+        self._validar_pesos()
+        origens = list(range(self.num_vertices)) if origens is None else list(origens)
+        processos = processos or os.cpu_count() or 1
+        tamanho_lote = max(1, -(-len(origens) // (4 * processos)))
+        lotes = [origens[i:i + tamanho_lote] for i in range(0, len(origens), tamanho_lote)]
+        # As distâncias já são reais; uma coluna de pesos em lista vai como 'd' para a memória compartilhada
+        pesos = array('d', self.pesos) if isinstance(self.pesos, list) else self.pesos
+        vetores = [self.offsets, self.destinos, pesos]
+
+        if processos == 1 or len(lotes) <= 1:
+            _iniciar_trabalhador_caminhos(None, vetores, self.num_vertices, self.dirigido)
+            try:
+                parciais = list(map(_distancias_lote, lotes))
+            finally:
+                _limpar_trabalhador()
+        else:
+            memoria, layout = _copiar_para_memoria_compartilhada(vetores)
+            try:
+                with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador_caminhos,
+                                         initargs=(memoria.name, layout, self.num_vertices, self.dirigido)) as executor:
+                    parciais = list(executor.map(_distancias_lote, lotes))
+            finally:
+                memoria.close()
+                memoria.unlink()
+        return [distancias for parcial in parciais for distancias in parcial]
+
+class FechoTransitivo:
+    def __init__(self, csr):
+        n = csr.num_vertices
+        self.num_vertices = n
+        num_componentes, componente = csr.componentes_fortes()
+        dag, _ = csr.condensacao()
+        membros = [0] * num_componentes
+        for v, c in enumerate(componente):
+            membros[c] |= 1 << v
+        # Os ids dos componentes seguem a ordem topológica: processando do último ao primeiro,
+        # o alcance de cada sucessor já está pronto e entra com um único OR entre inteiros
+        alcance = [0] * num_componentes
+        offsets, destinos = dag.offsets, dag.destinos
+        for c in range(num_componentes - 1, -1, -1):
+            bits = membros[c]
+            for d in destinos[offsets[c]:offsets[c + 1]]:
+                bits |= alcance[d]
+            alcance[c] = bits
+        tamanho = (n + 7) // 8
+        self.componente = componente
+        self.linhas = [bits.to_bytes(tamanho, "little") for bits in alcance]
+
+    def alcanca(self, u, v):
+        return bool(self.linhas[self.componente[u]][v >> 3] >> (v & 7) & 1)
+
+    def linha(self, u):
+        return int.from_bytes(self.linhas[self.componente[u]], "little")
+
+    def alcancaveis(self, u):
+        linha = self.linhas[self.componente[u]]
+        return [v for v in range(self.num_vertices) if linha[v >> 3] >> (v & 7) & 1]
+
+class ArvoreBlocosCorte:
+    def __init__(self, csr):
+        n = csr.num_vertices
+        self.num_vertices = n
+        self._calcular_blocos(csr)
+        self._montar_arvore()
+
+    def _calcular_blocos(self, csr):
+        n = self.num_vertices
+        offsets, destinos = csr.offsets, csr.destinos
+        indice = [-1] * n
+        baixo = [0] * n
+        proximo = list(offsets[:n])
+        pilha_u = []
+        pilha_v = []
+        offsets_blocos = array('q', [0])
+        vertices_blocos = array('q')
+        offsets_arestas = array('q', [0])
+        origens_arestas = array('q')
+        destinos_arestas = array('q')
+        marca = [-1] * n
+        blocos_por_vertice = [0] * n
+        contador = 0
+        for raiz in range(n):
+            if indice[raiz] != -1:
+                continue
+            indice[raiz] = baixo[raiz] = contador
+            contador += 1
+            chamadas = [raiz]
+            pais = [-1]
+            while chamadas:
+                v = chamadas[-1]
+                i = proximo[v]
+                if i < offsets[v + 1]:
+                    proximo[v] = i + 1
+                    w = destinos[i]
+                    if w == v:
+                        continue
+                    if indice[w] == -1:
+                        pilha_u.append(v)
+                        pilha_v.append(w)
+                        indice[w] = baixo[w] = contador
+                        contador += 1
+                        chamadas.append(w)
+                        pais.append(v)
+                    elif w != pais[-1] and indice[w] < indice[v]:
+                        pilha_u.append(v)
+                        pilha_v.append(w)
+                        if indice[w] < baixo[v]:
+                            baixo[v] = indice[w]
+                    continue
+                chamadas.pop()
+                p = pais.pop()
+                if p == -1:
+                    if blocos_por_vertice[v] == 0:
+                        # Vértice sem arestas (ou só com laços): forma um bloco sozinho
+                        marca[v] = len(offsets_blocos) - 1
+                        vertices_blocos.append(v)
+                        offsets_blocos.append(len(vertices_blocos))
+                        offsets_arestas.append(len(origens_arestas))
+                        blocos_por_vertice[v] = 1
+                    continue
+                if baixo[v] < baixo[p]:
+                    baixo[p] = baixo[v]
+                if baixo[v] >= indice[p]:
+                    # p separa a subárvore de v: as arestas empilhadas desde (p, v) formam um bloco
+                    bloco = len(offsets_blocos) - 1
+                    while True:
+                        a = pilha_u.pop()
+                        b = pilha_v.pop()
+                        origens_arestas.append(a)
+                        destinos_arestas.append(b)
+                        for x in (a, b):
+                            if marca[x] != bloco:
+                                marca[x] = bloco
+                                vertices_blocos.append(x)
+                                blocos_por_vertice[x] += 1
+                        if a == p and b == v:
+                            break
+                    offsets_blocos.append(len(vertices_blocos))
+                    offsets_arestas.append(len(origens_arestas))
+
+        self.num_blocos = len(offsets_blocos) - 1
+        self.offsets_blocos = offsets_blocos
+        self.vertices_blocos = vertices_blocos
+        self.offsets_arestas = offsets_arestas
+        self.origens_arestas = origens_arestas
+        self.destinos_arestas = destinos_arestas
+        self.articulacoes = array('q', [v for v in range(n) if blocos_por_vertice[v] > 1])
+        self._bloco_do_vertice = marca
+        self._bloco_ponte = {}
+        for bloco in range(self.num_blocos):
+            if offsets_arestas[bloco + 1] - offsets_arestas[bloco] == 1:
+                a = origens_arestas[offsets_arestas[bloco]]
+                b = destinos_arestas[offsets_arestas[bloco]]
+                self._bloco_ponte[(a, b) if a <= b else (b, a)] = bloco
+
+    def _montar_arvore(self):
+        # Nós 0..B-1 são os blocos e B.. as articulações; cada vértice comum aponta para o seu único bloco
+        n = self.num_vertices
+        num_blocos = self.num_blocos
+        no_articulacao = {v: num_blocos + i for i, v in enumerate(self.articulacoes)}
+        total = num_blocos + len(no_articulacao)
+        vizinhos = [[] for _ in range(total)]
+        offsets_blocos, vertices_blocos = self.offsets_blocos, self.vertices_blocos
+        for bloco in range(num_blocos):
+            for v in vertices_blocos[offsets_blocos[bloco]:offsets_blocos[bloco + 1]]:
+                no = no_articulacao.get(v)
+                if no is not None:
+                    vizinhos[bloco].append(no)
+                    vizinhos[no].append(bloco)
+        self.no_vertice = array('q', [no_articulacao.get(v, self._bloco_do_vertice[v]) for v in range(n)])
+        del self._bloco_do_vertice
+
+        profundidade = [-1] * total
+        arvore = [0] * total
+        primeira = [0] * total
+        euler = []
+        for raiz in range(total):
+            if profundidade[raiz] != -1:
+                continue
+            profundidade[raiz] = 0
+            arvore[raiz] = raiz
+            primeira[raiz] = len(euler)
+            euler.append(raiz)
+            pilha = [(raiz, iter(vizinhos[raiz]))]
+            while pilha:
+                no, filhos = pilha[-1]
+                for filho in filhos:
+                    if profundidade[filho] == -1:
+                        profundidade[filho] = profundidade[no] + 1
+                        arvore[filho] = raiz
+                        primeira[filho] = len(euler)
+                        euler.append(filho)
+                        pilha.append((filho, iter(vizinhos[filho])))
+                        break
+                else:
+                    pilha.pop()
+                    if pilha:
+                        euler.append(pilha[-1][0])
+        self.profundidade = array('q', profundidade)
+        self._arvore = array('q', arvore)
+        self._primeira = array('q', primeira)
+        # Tabela esparsa de mínimos sobre o percurso de Euler; cada chave codifica (profundidade, nó)
+        self._total = total
+        nivel = [profundidade[no] * total + no for no in euler]
+        self._tabela = [nivel]
+        salto = 1
+        while 2 * salto <= len(euler):
+            nivel = [a if a < b else b for a, b in zip(nivel, nivel[salto:])]
+            self._tabela.append(nivel)
+            salto *= 2
+
+    def _ancestral_comum(self, a, b):
+        i = self._primeira[a]
+        j = self._primeira[b]
+        if i > j:
+            i, j = j, i
+        k = (j - i + 1).bit_length() - 1
+        nivel = self._tabela[k]
+        x = nivel[i]
+        y = nivel[j - (1 << k) + 1]
+        return (x if x < y else y) % self._total
+
+    def _no_no_caminho(self, x, a, b):
+        if self._arvore[x] != self._arvore[a]:
+            return False
+        profundidade = self.profundidade
+        ab = self._ancestral_comum(a, b)
+        ax = self._ancestral_comum(a, x)
+        xb = self._ancestral_comum(x, b)
+        distancia_ab = profundidade[a] + profundidade[b] - 2 * profundidade[ab]
+        distancia_axb = profundidade[a] + profundidade[b] + 2 * profundidade[x] - 2 * profundidade[ax] - 2 * profundidade[xb]
+        return distancia_ab == distancia_axb
+
+    def vertices_bloco(self, bloco):
+        return self.vertices_blocos[self.offsets_blocos[bloco]:self.offsets_blocos[bloco + 1]]
+
+    def arestas_bloco(self, bloco):
+        inicio = self.offsets_arestas[bloco]
+        fim = self.offsets_arestas[bloco + 1]
+        return list(zip(self.origens_arestas[inicio:fim], self.destinos_arestas[inicio:fim]))
+
+    def eh_articulacao(self, v):
+        return self.no_vertice[v] >= self.num_blocos
+
+    def conectados(self, u, v):
+        return self._arvore[self.no_vertice[u]] == self._arvore[self.no_vertice[v]]
+
+    def separa_vertice(self, x, u, v):
+        if x == u or x == v:
+            raise ValueError("O vértice removido não pode ser uma das extremidades da consulta.")
+        if not self.conectados(u, v):
+            return True
+        if not self.eh_articulacao(x):
+            return False
+        no_vertice = self.no_vertice
+        return self._no_no_caminho(no_vertice[x], no_vertice[u], no_vertice[v])
+
+    def separa_aresta(self, a, b, u, v):
+        if u == v:
+            return False
+        if not self.conectados(u, v):
+            return True
+        bloco = self._bloco_ponte.get((a, b) if a <= b else (b, a))
+        if bloco is None:
+            return False
+        no_vertice = self.no_vertice
+        return self._no_no_caminho(bloco, no_vertice[u], no_vertice[v])
+
+@contextlib.contextmanager
+def _arquivo_atomico(caminho, modo="w", encoding=None):
+    # Escreve num temporário no mesmo diretório e só então substitui o destino com os.replace
+    fd, temporario = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(caminho) or ".")
+    try:
+        with os.fdopen(fd, modo, encoding=encoding) as arquivo:
+            yield arquivo
+        os.replace(temporario, caminho)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temporario)
+        raise
+
+class QuadroPPM:
+    def __init__(self, largura, altura, fundo=(255, 255, 255)):
+        self.largura = largura
+        self.altura = altura
+        cabecalho = f"P6\n{largura} {altura}\n255\n".encode()
+        self.inicio = len(cabecalho)
+        self.dados = bytearray(cabecalho) + bytearray(bytes(fundo) * (largura * altura))
+
+    def copiar(self):
+        copia = QuadroPPM.__new__(QuadroPPM)
+        copia.largura = self.largura
+        copia.altura = self.altura
+        copia.inicio = self.inicio
+        copia.dados = bytearray(self.dados)
+        return copia
+
+    def pixel(self, x, y):
+        i = self.inicio + 3 * (y * self.largura + x)
+        return tuple(self.dados[i:i + 3])
+
+    def _linha_horizontal(self, y, xa, xb, cor):
+        if not 0 <= y < self.altura:
+            return
+        xa = max(xa, 0)
+        xb = min(xb, self.largura - 1)
+        if xa <= xb:
+            i = self.inicio + 3 * (y * self.largura + xa)
+            self.dados[i:i + 3 * (xb - xa + 1)] = cor * (xb - xa + 1)
+
+    def _linha_vertical(self, x, ya, yb, cor):
+        if not 0 <= x < self.largura:
+            return
+        ya = max(ya, 0)
+        yb = min(yb, self.altura - 1)
+        if ya <= yb:
+            passo = 3 * self.largura
+            i = self.inicio + 3 * (ya * self.largura + x)
+            fim = i + passo * (yb - ya) + 1
+            quantidade = yb - ya + 1
+            for canal in range(3):
+                self.dados[i + canal:fim + canal:passo] = cor[canal:canal + 1] * quantidade
+
+    def desenhar_circulo(self, x0, y0, raio, cor):
+        x0 = int(x0)
+        y0 = int(y0)
+        cor = bytes(cor)
+        for y in range(y0 - raio, y0 + raio + 1):
+            meia_largura = math.isqrt(raio * raio - (y - y0) ** 2)
+            self._linha_horizontal(y, x0 - meia_largura, x0 + meia_largura, cor)
+
+    def desenhar_linha(self, x1, y1, x2, y2, cor):
+        x1 = int(x1)
+        y1 = int(y1)
+        x2 = int(x2)
+        y2 = int(y2)
+        cor = bytes(cor)
+        dx = abs(x2 - x1)
+        dy = abs(y2 - y1)
+        sx = 1 if x2 > x1 else -1
+        sy = 1 if y2 > y1 else -1
+        # Bresenham por trechos: o passo k do eixo principal desloca o eixo
+        # secundário em j(k) = ceil((k * menor - maior // 2) / maior), então
+        # cada valor de j cobre um trecho contíguo que é pintado de uma vez.
+        if dx > dy:
+            maior, menor = dx, dy
+        else:
+            maior, menor = dy, dx
+        k_inicio = 0
+        j = 0
+        while k_inicio < maior:
+            k_fim = maior - 1 if menor == 0 else min(maior - 1, (maior // 2 + j * maior) // menor)
+            if dx > dy:
+                xa = x1 + sx * k_inicio
+                xb = x1 + sx * k_fim
+                self._linha_horizontal(y1 + sy * j, min(xa, xb), max(xa, xb), cor)
+            else:
+                ya = y1 + sy * k_inicio
+                yb = y1 + sy * k_fim
+                self._linha_vertical(x1 + sx * j, min(ya, yb), max(ya, yb), cor)
+            k_inicio = k_fim + 1
+            j += 1
+        self._linha_horizontal(y2, x2, x2, cor)
+
+    def salvar(self, nome_arquivo):
+        with _arquivo_atomico(nome_arquivo, "wb") as f:
+            f.write(self.dados)
+
+class SaidaQuadrosArquivos:
+    def __init__(self, diretorio, numero_inicial=0):
+        self.diretorio = diretorio
+        self.numero = numero_inicial
+        if not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+    def escrever(self, quadro):
+        quadro.salvar(os.path.join(self.diretorio, f"frame_{self.numero}.ppm"))
+        self.numero += 1
+
+    def fechar(self):
+        pass
+
+class SaidaQuadrosFluxo:
+    def __init__(self, destino):
+        self.numero = 0
+        self._proprio = not hasattr(destino, "write")
+        self.fluxo = open(destino, "wb") if self._proprio else destino
+
+    def escrever(self, quadro):
+        self.fluxo.write(quadro.dados)
+        self.numero += 1
+
+    def fechar(self):
+        if self._proprio:
+            self.fluxo.close()
+        else:
+            self.fluxo.flush()
+
+def _passo_quadros(num_arestas, passo_quadros=1, max_quadros=None):
+    if max_quadros:
+        return max(passo_quadros, -(-num_arestas // max_quadros))
+    return passo_quadros
+
+def _renderizar_ppm(num_vertices, origens, destinos, caminho, saida, passo_quadros=1, max_quadros=None):
+    # Só recebe vetores de arestas, então pode rodar em outro processo
+    largura = 800
+    altura = 800
+    raio_vertice = 20
+    num_cols = int(num_vertices ** 0.5) + 1
+    num_rows = (num_vertices // num_cols) + 1
+    espacamento_x = largura // (num_cols + 1)
+    espacamento_y = altura // (num_rows + 1)
+    posicoes = [((i % num_cols + 1) * espacamento_x, (i // num_cols + 1) * espacamento_y) for i in range(num_vertices)]
+
+    imagem = QuadroPPM(largura, altura)
+    for x, y in posicoes:
+        imagem.desenhar_circulo(x, y, raio_vertice, (0, 0, 255))
+
+    m = len(origens)
+    passo_quadros = _passo_quadros(m, passo_quadros, max_quadros)
+    try:
+        for idx, (u, v) in enumerate(zip(origens, destinos)):
+            x1, y1 = posicoes[u]
+            x2, y2 = posicoes[v]
+            imagem.desenhar_linha(x1, y1, x2, y2, (0, 0, 0))
+            if (idx + 1) % passo_quadros == 0 or idx == m - 1:
+                saida.escrever(imagem)
+    finally:
+        saida.fechar()
+    imagem.salvar(caminho)
+    return saida.numero
+
+def _cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+class UniaoBusca:
+    def __init__(self, num_elementos):
+        self.pai = list(range(num_elementos))
+        self.rank = bytearray(num_elementos)
+        self.num_componentes = num_elementos
+
+    def encontrar(self, x):
+        pai = self.pai
+        raiz = x
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        # Compressão de caminho: todo o trajeto passa a apontar direto para a raiz
+        while pai[x] != raiz:
+            pai[x], x = raiz, pai[x]
+        return raiz
+
+    def unir(self, x, y):
+        x = self.encontrar(x)
+        y = self.encontrar(y)
+        if x == y:
+            return False
+        rank = self.rank
+        if rank[x] < rank[y]:
+            x, y = y, x
+        self.pai[y] = x
+        if rank[x] == rank[y]:
+            rank[x] += 1
+        self.num_componentes -= 1
+        return True
+
+    def mesmo_componente(self, x, y):
+        return self.encontrar(x) == self.encontrar(y)
+
+    def adicionar_elemento(self):
+        self.pai.append(len(self.pai))
+        self.rank.append(0)
+        self.num_componentes += 1
+
+class PontesIncrementais:
+    # Floresta geradora sobre os componentes 2-aresta-conexos: cada aresta da floresta é uma ponte
+    def __init__(self, num_vertices):
+        self.pai = [-1] * num_vertices
+        self.bloco = list(range(num_vertices))
+        self.arvore = list(range(num_vertices))
+        self.tamanho_arvore = [1] * num_vertices
+        self.aresta_pai = {}
+        self._marca = [0] * num_vertices
+        self._iteracao = 0
+
+    def _encontrar_bloco(self, v):
+        bloco = self.bloco
+        raiz = v
+        while bloco[raiz] != raiz:
+            raiz = bloco[raiz]
+        while bloco[v] != raiz:
+            bloco[v], v = raiz, bloco[v]
+        return raiz
+
+    def _encontrar_arvore(self, v):
+        arvore = self.arvore
+        v = self._encontrar_bloco(v)
+        caminho = []
+        while arvore[v] != v:
+            caminho.append(v)
+            v = self._encontrar_bloco(arvore[v])
+        for w in caminho:
+            arvore[w] = v
+        return v
+
+    def _tornar_raiz(self, v):
+        pai, aresta_pai = self.pai, self.aresta_pai
+        raiz = v
+        filho = -1
+        aresta = None
+        while v != -1:
+            p = self._encontrar_bloco(pai[v]) if pai[v] != -1 else -1
+            proxima = aresta_pai.pop(v, None)
+            pai[v] = filho
+            if aresta is not None:
+                aresta_pai[v] = aresta
+            self.arvore[v] = raiz
+            filho = v
+            v = p
+            aresta = proxima
+        self.tamanho_arvore[raiz] = self.tamanho_arvore[filho]
+
+    def _fundir_caminho(self, a, b):
+        # Sobe alternadamente de a e de b até o ancestral comum; os blocos do ciclo viram um só
+        self._iteracao += 1
+        iteracao = self._iteracao
+        marca, pai = self._marca, self.pai
+        caminho_a = []
+        caminho_b = []
+        ancestral = -1
+        while ancestral == -1:
+            if a != -1:
+                a = self._encontrar_bloco(a)
+                caminho_a.append(a)
+                if marca[a] == iteracao:
+                    ancestral = a
+                    break
+                marca[a] = iteracao
+                a = pai[a]
+            if b != -1:
+                b = self._encontrar_bloco(b)
+                caminho_b.append(b)
+                if marca[b] == iteracao:
+                    ancestral = b
+                    break
+                marca[b] = iteracao
+                b = pai[b]
+        for caminho in (caminho_a, caminho_b):
+            for v in caminho:
+                if v == ancestral:
+                    break
+                self.bloco[v] = ancestral
+                del self.aresta_pai[v]
+
+    def adicionar_aresta(self, u, v):
+        a = self._encontrar_bloco(u)
+        b = self._encontrar_bloco(v)
+        if a == b:
+            return
+        arvore_a = self._encontrar_arvore(a)
+        arvore_b = self._encontrar_arvore(b)
+        if arvore_a != arvore_b:
+            # Nova aresta da floresta: a árvore menor é re-enraizada e pendurada na maior
+            if self.tamanho_arvore[arvore_a] > self.tamanho_arvore[arvore_b]:
+                a, b, u, v, arvore_b = b, a, v, u, arvore_a
+            self._tornar_raiz(a)
+            self.pai[a] = b
+            self.arvore[a] = b
+            self.aresta_pai[a] = (u, v)
+            self.tamanho_arvore[arvore_b] += self.tamanho_arvore[a]
+        else:
+            self._fundir_caminho(a, b)
+
+    def adicionar_vertice(self):
+        v = len(self.pai)
+        self.pai.append(-1)
+        self.bloco.append(v)
+        self.arvore.append(v)
+        self.tamanho_arvore.append(1)
+        self._marca.append(0)
+
+    def num_pontes(self):
+        return len(self.aresta_pai)
+
+    def pontes(self):
+        return [(u, v) if u <= v else (v, u) for u, v in self.aresta_pai.values()]
+
+    def eh_ponte(self, u, v):
+        a = self._encontrar_bloco(u)
+        b = self._encontrar_bloco(v)
+        if a == b:
+            return False
+        # Arestas entre blocos distintos de uma mesma árvore só existem na floresta
+        return self.aresta_pai.get(a) in ((u, v), (v, u)) or self.aresta_pai.get(b) in ((u, v), (v, u))
+
+    def componente(self, v):
+        return self._encontrar_bloco(v)
+
+    def mesmo_componente(self, u, v):
+        return self._encontrar_bloco(u) == self._encontrar_bloco(v)
+
+    def componentes(self):
+        grupos = {}
+        for v in range(len(self.pai)):
+            grupos.setdefault(self._encontrar_bloco(v), []).append(v)
+        return list(grupos.values())
+
+POLITICAS_MATRIZES = ("sempre", "preguicoso", "nunca")
+
+def _copiar_resultado(valor):
+    # O cache guarda o original e entrega cópias: listas de pontes/articulações e listas de listas (SCC)
+    if isinstance(valor, list):
+        if valor and isinstance(valor[0], list):
+            return [list(item) for item in valor]
+        return valor.copy()
+    return valor
+
+def _memorizado(metodo):
+    nome = metodo.__name__
+
+    @functools.wraps(metodo)
+    def memorizado(self, *args, **kwargs):
+        chave = (nome, args, tuple(sorted(kwargs.items())))
+        cache = self._cache_resultados
+        item = cache.get(chave)
+        if item is not None and item[0] == self.versao:
+            cache.move_to_end(chave)
+            return _copiar_resultado(item[1])
+        resultado = metodo(self, *args, **kwargs)
+        cache[chave] = (self.versao, resultado)
+        cache.move_to_end(chave)
+        while len(cache) > self.tamanho_cache:
+            cache.popitem(last=False)
+        return _copiar_resultado(resultado)
+
+    return memorizado
+
+# Atributos que um grafo aberto por Grafo.load monta a partir do CSR só quando alguém os usa
+_ESTADO_MUTAVEL = ("lista_adj", "_armazem", "_id_aresta")
+
 class Grafo:
-    def __init__(self, num_vertices, dirigido=False, nome=""):
+    def __init__(self, num_vertices, dirigido=False, nome="", matrizes="preguicoso", conectividade=False, pontes_incrementais=False,
+                 matriz_compacta=False):
+        if matrizes not in POLITICAS_MATRIZES:
+            raise ValueError(f"Política de matrizes inválida: {matrizes!r}. Use uma de {POLITICAS_MATRIZES}.")
         self.num_vertices = num_vertices
         self.dirigido = dirigido
         self.nome = nome 
+        self.matrizes = matrizes
+        self.matriz_compacta = matriz_compacta
         self.lista_adj = ListaAdjacencia(num_vertices, dirigido)
-        self.matriz_adj = MatrizAdjacencia(num_vertices, dirigido)
-        self.matriz_inc = MatrizIncidencia(num_vertices, dirigido)
-        self.edge_list = []
-        self.vertex_labels = {i: f"V{i + 1}" for i in range(num_vertices)}
+        self._matriz_adj = None
+        self._matriz_inc = None
+        self._armazem = ArmazemArestas()
+        self._id_aresta = {}
+        if matrizes == "sempre":
+            self._matriz_adj = self._nova_matriz_adj()
+            self._matriz_inc = MatrizIncidencia(num_vertices, dirigido, self._armazem)
+        self.vertex_labels = RotulosVertices(num_vertices)
         self.tempo = 0
         self.frame_count = 0
+        self._csr = None
+        self.versao = 0
+        self.tamanho_cache = 64
+        self._cache_resultados = OrderedDict()
+        self.conectividade = conectividade
+        self._uniao = None
+        self._separacao = None
+        self.pontes_incrementais = pontes_incrementais
+        self._pontes = None
+
+    @classmethod
+    def from_arrays(cls, origens, destinos, pesos=None, num_vertices=None, dirigido=False, nome="", matrizes="preguicoso", labels=None, conectividade=False, pontes_incrementais=False,
+                    matriz_compacta=False):
+        origens = _como_lista(origens)
+        destinos = _como_lista(destinos)
+        if num_vertices is None:
+            num_vertices = max(max(origens), max(destinos)) + 1 if origens else 0
+        grafo = cls(num_vertices, dirigido, nome, matrizes, conectividade, pontes_incrementais, matriz_compacta)
+        grafo.adicionar_arestas(origens, destinos, pesos, labels)
+        return grafo
+
+    @classmethod
+    def carregar_lista_arestas(cls, caminho, dirigido=False, nome=None, num_vertices=None, indice_base=0, matrizes="preguicoso", tamanho_bloco=1 << 24):
+        acumulador = ler_lista_arestas(caminho, tamanho_bloco)
+        origens = acumulador.origens
+        destinos = acumulador.destinos
+        if indice_base:
+            origens = array('q', map(add, origens, repeat(-indice_base)))
+            destinos = array('q', map(add, destinos, repeat(-indice_base)))
+        if nome is None:
+            nome = os.path.splitext(os.path.basename(caminho))[0]
+        return cls.from_arrays(origens, destinos, acumulador.pesos, num_vertices, dirigido, nome, matrizes, acumulador.lista_labels())
+
+    @classmethod
+    def importar_de_gexf(cls, caminho, nome=None, matrizes="preguicoso"):
+        acumulador, num_vertices, dirigido, rotulos_vertices = ler_gexf(caminho)
+        if nome is None:
+            nome = os.path.splitext(os.path.basename(caminho))[0]
+        grafo = cls.from_arrays(acumulador.origens, acumulador.destinos, acumulador.pesos, num_vertices, dirigido, nome, matrizes, acumulador.lista_labels())
+        for v, label in rotulos_vertices.items():
+            grafo.vertex_labels[v] = label
+        return grafo
+
+    def save(self, caminho):
+        csr = self.congelar()
+        rotulos = {"nome": self.nome, "vertices": {}, "arestas": {}, "num_arestas": len(self._armazem)}
+        for v, label in self.vertex_labels.definidos.items():
+            rotulos["vertices"][str(v)] = label
+        armazem = self._armazem
+        if armazem.rotulos:
+            rotulados = {_chave_aresta(armazem.origens[i], armazem.destinos[i], self.dirigido): armazem.rotulo(i)
+                         for i in armazem.rotulos}
+            origens, destinos, _ = csr.arestas()
+            for i, (u, v) in enumerate(zip(origens, destinos)):
+                label = rotulados.get(_chave_aresta(u, v, self.dirigido))
+                if label:
+                    rotulos["arestas"][str(i)] = label
+        _escrever_snapshot(caminho, csr, rotulos)
+
+    @classmethod
+    def load(cls, caminho, mmap=True, matrizes="preguicoso"):
+        csr = _ler_snapshot(caminho, mmap)
+        # Análises usam o CSR mapeado; o estado mutável só é montado no primeiro acesso (ver __getattr__)
+        grafo = cls(0, csr.dirigido, csr.nome, matrizes)
+        grafo.num_vertices = grafo.vertex_labels.num_vertices = csr.num_vertices
+        for v, label in csr.rotulos.get("vertices", {}).items():
+            grafo.vertex_labels[int(v)] = label
+        del grafo.lista_adj, grafo._armazem, grafo._id_aresta
+        grafo._matriz_adj = grafo._matriz_inc = None
+        grafo._csr = grafo._csr_carregado = csr
+        return grafo
+
+    def __getattr__(self, nome):
+        # Só é chamado quando o atributo não existe, então grafos comuns não pagam nada por isso
+        if nome in _ESTADO_MUTAVEL and "_csr_carregado" in self.__dict__:
+            self._materializar()
+            return getattr(self, nome)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {nome!r}")
+
+    def _materializar(self):
+        csr = self.__dict__.pop("_csr_carregado")
+        self.lista_adj = ListaAdjacencia(csr.num_vertices, csr.dirigido)
+        self._armazem = ArmazemArestas()
+        self._id_aresta = {}
+        origens, destinos, pesos = csr.arestas()
+        labels = None
+        rotulos_arestas = csr.rotulos.get("arestas", {})
+        if rotulos_arestas:
+            labels = [None] * len(origens)
+            for i, label in rotulos_arestas.items():
+                labels[int(i)] = label
+        # Montar o estado não muda o grafo: versão e CSR congelado continuam valendo
+        versao, csr_atual = self.versao, self._csr
+        self.adicionar_arestas(origens, destinos, pesos, labels)
+        self.versao, self._csr = versao, csr_atual
+
+    @property
+    def matriz_adj(self):
+        if self._matriz_adj is None:
+            self._checar_matrizes_habilitadas()
+            matriz = self._nova_matriz_adj()
+            for u, adj in self.lista_adj.adjacencias.items():
+                for v, peso in adj.items():
+                    matriz.definir(u, v, peso)
+            self._matriz_adj = matriz
+        return self._matriz_adj
+
+    def _nova_matriz_adj(self):
+        if self.matriz_compacta:
+            return MatrizAdjacenciaCompacta(self.num_vertices, self.dirigido)
+        return MatrizAdjacencia(self.num_vertices, self.dirigido)
+
+    @property
+    def matriz_inc(self):
+        if self._matriz_inc is None:
+            self._checar_matrizes_habilitadas()
+            matriz = MatrizIncidencia(self.num_vertices, self.dirigido, self._armazem)
+            matriz.reindexar()
+            self._matriz_inc = matriz
+        return self._matriz_inc
+
+    def _checar_matrizes_habilitadas(self):
+        if self.matrizes == "nunca":
+            raise RuntimeError(f"O grafo '{self.nome}' foi criado com matrizes='nunca'.")
+
+    def _representacoes_construidas(self):
+        representacoes = [self.lista_adj]
+        if self._matriz_adj is not None:
+            representacoes.append(self._matriz_adj)
+        if self._matriz_inc is not None:
+            representacoes.append(self._matriz_inc)
+        return representacoes
+
+    @property
+    def edge_list(self):
+        return self._armazem.edge_list()
+
+    def buscar_aresta(self, u, v):
+        edge_id = self._id_aresta.get(_chave_aresta(u, v, self.dirigido))
+        if edge_id is None:
+            return None
+        return self._armazem.como_dicionario(edge_id)
 
     def adicionar_vertice(self, label=None):
         v = self.num_vertices
-        self.lista_adj.num_vertices += 1
-        self.matriz_adj.num_vertices += 1
-        self.matriz_inc.num_vertices += 1
         self.num_vertices += 1
-        self.lista_adj.adjacencias[v] = []
-        
-        for row in self.matriz_adj.adj_matrix:
-            row.append(0)
-        self.matriz_adj.adj_matrix.append([0] * self.matriz_adj.num_vertices)
-        
-        for row in self.matriz_inc.inc_matrix:
-            row.append(0)
-        
-        self.vertex_labels[v] = label if label else f"V{v + 1}"
+        for representacao in self._representacoes_construidas():
+            representacao.adicionar_vertice()
+        self.vertex_labels.num_vertices += 1
+        if label:
+            self.vertex_labels[v] = label
+        self._csr = None
+        self.versao += 1
+        if self._uniao is not None:
+            self._uniao.adicionar_elemento()
+        if self._pontes is not None:
+            self._pontes.adicionar_vertice()
 
     def adicionar_aresta(self, u, v, peso=1, label=None):
+        chave = _chave_aresta(u, v, self.dirigido)
+        if chave in self._id_aresta:
+            return
         self.lista_adj.adicionar_aresta(u, v, peso, label)
-        self.matriz_adj.adicionar_aresta(u, v, peso)
-        self.matriz_inc.adicionar_aresta(u, v, peso, label)
-        self.edge_list.append({'u': u, 'v': v, 'peso': peso, 'label': label})
+        if self._matriz_adj is not None:
+            self._matriz_adj.adicionar_aresta(u, v, peso)
+        edge_id = self._armazem.adicionar(u, v, peso, label)
+        if self._matriz_inc is not None:
+            self._matriz_inc.indexar(edge_id, u, v)
+        self._id_aresta[chave] = edge_id
+        self._csr = None
+        self.versao += 1
+        if self._uniao is not None:
+            if self._separacao is None:
+                self._uniao.unir(u, v)
+            elif self._separacao[0] == chave:
+                # Reinserção da aresta que separou o componente: volta ao estado anterior à remoção
+                self._separacao = None
+            else:
+                self._uniao = self._separacao = None
+        if self._pontes is not None:
+            self._pontes.adicionar_aresta(u, v)
+
+    def adicionar_arestas(self, origens, destinos=None, pesos=None, labels=None):
+        if destinos is None:
+            arestas = list(origens)
+            origens = [aresta[0] for aresta in arestas]
+            destinos = [aresta[1] for aresta in arestas]
+            if any(len(aresta) > 2 for aresta in arestas):
+                pesos = [aresta[2] if len(aresta) > 2 else 1 for aresta in arestas]
+            if any(len(aresta) > 3 for aresta in arestas):
+                labels = [aresta[3] if len(aresta) > 3 else None for aresta in arestas]
+        origens = _como_lista(origens)
+        destinos = _como_lista(destinos)
+        pesos = _como_lista(pesos) if pesos is not None else None
+        labels = _como_lista(labels) if labels is not None else None
+        m = len(origens)
+        if len(destinos) != m or (pesos is not None and len(pesos) != m) or (labels is not None and len(labels) != m):
+            raise ValueError("Os vetores de origens, destinos, pesos e rótulos devem ter o mesmo tamanho.")
+        if m == 0:
+            return 0
+        n = self.num_vertices
+        if min(min(origens), min(destinos)) < 0 or max(max(origens), max(destinos)) >= n:
+            raise ValueError(f"Vértices válidos estão entre 0 e {n - 1}.")
+
+        # Chaves inteiras u * n + v: deduplicação e ordenação sem tuplas intermediárias
+        if self.dirigido:
+            chaves = list(map(add, map(mul, origens, repeat(n)), destinos))
+        else:
+            chaves = [u * n + v if u <= v else v * n + u for u, v in zip(origens, destinos)]
+        if pesos is None and labels is None:
+            unicas = set(chaves)
+            primeira_ocorrencia = None
+        else:
+            unicas = primeira_ocorrencia = dict(zip(reversed(chaves), range(m - 1, -1, -1)))
+        del chaves
+        if self._id_aresta:
+            existentes = {u * n + v for u, v in self._id_aresta}
+            novas = sorted(unicas.keys() - existentes if primeira_ocorrencia is not None else unicas - existentes)
+        else:
+            novas = sorted(unicas)
+        del unicas
+        pares = list(map(divmod, novas, repeat(n)))
+        if primeira_ocorrencia is not None:
+            indices = list(map(primeira_ocorrencia.__getitem__, novas))
+            del primeira_ocorrencia
+            ps = list(map(pesos.__getitem__, indices)) if pesos is not None else [1] * len(pares)
+            ls = list(map(labels.__getitem__, indices)) if labels is not None else [None] * len(pares)
+            del indices
+        else:
+            ps = [1] * len(pares)
+            ls = [None] * len(pares)
+        del novas
+
+        adjacencias = self.lista_adj.adjacencias
+        for (u, v), peso in zip(pares, ps):
+            adjacencias[u][v] = peso
+        if not self.dirigido:
+            for (u, v), peso in zip(pares, ps):
+                adjacencias[v][u] = peso
+        if self._matriz_adj is not None:
+            for (u, v), peso in zip(pares, ps):
+                self._matriz_adj.adicionar_aresta(u, v, peso)
+        ids = self._armazem.adicionar_lote(pares, ps, ls)
+        if self._matriz_inc is not None:
+            indexar = self._matriz_inc.indexar
+            for edge_id, (u, v) in zip(ids, pares):
+                indexar(edge_id, u, v)
+        self._id_aresta.update(zip(pares, ids))
+        inseridas = len(pares)
+        self._csr = None
+        if inseridas:
+            self.versao += 1
+        if self._uniao is not None and self._separacao is not None:
+            self._uniao = self._separacao = None
+        elif self._uniao is not None:
+            unir = self._uniao.unir
+            for u, v in pares:
+                unir(u, v)
+        if self._pontes is not None:
+            adicionar = self._pontes.adicionar_aresta
+            for u, v in pares:
+                adicionar(u, v)
+        return inseridas
 
     def remover_aresta(self, u, v):
-        self.lista_adj.remover_aresta(u, v)
-        self.matriz_adj.remover_aresta(u, v)
-        self.matriz_inc.remover_aresta(u, v)
-        
-        for i, edge in enumerate(self.edge_list):
-            if edge['u'] == u and edge['v'] == v:
-                del self.edge_list[i]
-                break
-            if not self.dirigido and edge['u'] == v and edge['v'] == u:
-                del self.edge_list[i]
-                break
+        chave = _chave_aresta(u, v, self.dirigido)
+        edge_id = self._id_aresta.pop(chave, None)
+        if edge_id is None:
+            return
+        self._armazem.remover(edge_id)
+        for representacao in self._representacoes_construidas():
+            representacao.remover_aresta(u, v)
+        if self._armazem.precisa_compactar():
+            self._compactar_arestas()
+        self._csr = None
+        self.versao += 1
+        # Remoções podem criar pontes; a estrutura incremental é refeita na próxima consulta
+        self._pontes = None
+        if self._uniao is None:
+            return
+        if self.dirigido or self._separacao is not None:
+            self._uniao = self._separacao = None
+            return
+        lado = self._lado_separado(u, v)
+        if lado is not None:
+            # A aresta separou um componente: guarda o lado menor até a reinserção da aresta ou a próxima mudança
+            self._separacao = (chave, lado)
+
+    def _lado_separado(self, u, v):
+        if u == v:
+            return None
+        adjacencias = self.lista_adj.adjacencias
+        lado_de = {u: 0, v: 1}
+        pilhas = ([u], [v])
+        tamanhos = [1, 1]
+        # Busca bidirecional crescendo sempre o lado com menos vértices: para ao esgotar o lado menor
+        while pilhas[0] and pilhas[1]:
+            lado = 0 if tamanhos[0] <= tamanhos[1] else 1
+            pilha = pilhas[lado]
+            for w in adjacencias[pilha.pop()]:
+                marca = lado_de.get(w)
+                if marca is None:
+                    lado_de[w] = lado
+                    pilha.append(w)
+                    tamanhos[lado] += 1
+                elif marca != lado:
+                    return None
+        lado = 0 if not pilhas[0] else 1
+        return {w for w, marca in lado_de.items() if marca == lado}
+
+    def _uniao_busca(self):
+        if self._uniao is not None:
+            return self._uniao
+        uniao = UniaoBusca(self.num_vertices)
+        unir = uniao.unir
+        for u, v in self._id_aresta:
+            unir(u, v)
+        if self.conectividade:
+            self._uniao = uniao
+        return uniao
+
+    def _estrutura_pontes(self):
+        if self.dirigido:
+            raise ValueError("Pontes incrementais só se aplicam a grafos não direcionados.")
+        if self._pontes is not None:
+            return self._pontes
+        pontes = PontesIncrementais(self.num_vertices)
+        adicionar = pontes.adicionar_aresta
+        for u, v in self._id_aresta:
+            adicionar(u, v)
+        if self.pontes_incrementais:
+            self._pontes = pontes
+        return pontes
+
+    def eh_ponte(self, u, v):
+        return self.checar_adjacencia_vertices(u, v) and self._estrutura_pontes().eh_ponte(u, v)
+
+    def contar_pontes(self):
+        return self._estrutura_pontes().num_pontes()
+
+    def componentes_2_aresta_conexos(self):
+        return self._estrutura_pontes().componentes()
+
+    def mesmo_componente_2_aresta(self, u, v):
+        return self._estrutura_pontes().mesmo_componente(u, v)
+
+    def contar_componentes(self):
+        return self._uniao_busca().num_componentes + (self._separacao is not None)
+
+    def mesmo_componente(self, u, v):
+        if not self._uniao_busca().mesmo_componente(u, v):
+            return False
+        if self._separacao is None:
+            return True
+        lado = self._separacao[1]
+        return (u in lado) == (v in lado)
+
+    def _compactar_arestas(self):
+        armazem = self._armazem
+        armazem.compactar()
+        dirigido = self.dirigido
+        self._id_aresta = {_chave_aresta(u, v, dirigido): edge_id
+                           for edge_id, (u, v) in enumerate(zip(armazem.origens, armazem.destinos))}
+        if self._matriz_inc is not None:
+            self._matriz_inc.reindexar()
+
+    def invalidar_cache(self):
+        self._cache_resultados.clear()
+        self._csr = None
+
+    def congelar(self):
+        if self._csr is None:
+            self._csr = GrafoCSR.de_grafo(self)
+        return self._csr
 
     def checar_adjacencia_vertices(self, u, v):
-        return (self.lista_adj.checar_adjacencia(u, v) and
-                self.matriz_adj.checar_adjacencia(u, v) and
-                self.matriz_inc.checar_adjacencia(u, v))
+        return _chave_aresta(u, v, self.dirigido) in self._id_aresta
 
     def contar_vertices_arestas(self):
         num_vertices = self.num_vertices
-        num_arestas = len(self.edge_list)
+        carregado = self.__dict__.get("_csr_carregado")
+        if carregado is not None and "num_arestas" in carregado.rotulos:
+            return num_vertices, carregado.rotulos["num_arestas"]
+        num_arestas = len(self._armazem)
         return num_vertices, num_arestas
 
     def grafo_vazio(self):
@@ -168,332 +2370,188 @@ class Grafo:
     def identificar_pontes_naive(self):
         pontes = []
         for u in range(self.num_vertices):
-            for v, _ in list(self.lista_adj.adjacencias[u]):
+            for v in list(self.lista_adj.adjacencias[u]):
                 if (u < v) or self.dirigido:
+                    edge = self.buscar_aresta(u, v)
                     self.remover_aresta(u, v)
                     if not self.grafo_conexo():
                         pontes.append((u, v))
-                    self.adicionar_aresta(u, v)
+                    self.adicionar_aresta(edge['u'], edge['v'], edge['peso'], edge['label'])
         return pontes
 
-    def identificar_pontes_tarjan(self):
-        num = [0] * self.num_vertices
-        low = [0] * self.num_vertices
-        self.tempo = 1
-        pontes = []
-        visited = [False] * self.num_vertices
-        parent = [-1] * self.num_vertices
+    @_memorizado
+    def identificar_pontes_tarjan(self, paralelo=False, processos=None):
+        if paralelo:
+            return self.congelar().analisar_componentes_paralelo(("pontes",), processos)["pontes"]
+        if self.pontes_incrementais and not self.dirigido:
+            return self._estrutura_pontes().pontes()
+        return self.congelar().identificar_pontes_tarjan()
+
+    @_memorizado
+    def identificar_articulacoes(self, paralelo=False, processos=None):
+        if paralelo:
+            return self.congelar().analisar_componentes_paralelo(("articulacoes",), processos)["articulacoes"]
+        return self.congelar().identificar_articulacoes()
+
+    @_memorizado
+    def grafo_conexo(self):
+        if self.conectividade and not self.dirigido:
+            return self.contar_componentes() == 1
+        return self.congelar().grafo_conexo()
+
+    @_memorizado
+    def kosaraju_scc(self, paralelo=False, processos=None):
+        if paralelo:
+            return self.congelar().analisar_componentes_paralelo(("scc",), processos)["scc"]
+        num_componentes, componente = self.componentes_fortes()
+        scc_list = [[] for _ in range(num_componentes)]
+        for v, c in enumerate(componente):
+            scc_list[c].append(v)
+        return scc_list
 
-        for u in range(self.num_vertices):
-            if not visited[u]:
-                self._tarjan_dfs(u, visited, parent, num, low, pontes)
-        return pontes
+    def componentes_fortes(self):
+        return self.congelar().componentes_fortes()
 
-    def _tarjan_dfs(self, u, visited, parent, num, low, pontes):
-        stack = [(u, iter(self.lista_adj.adjacencias[u]))]
-        visited[u] = True
-        num[u] = low[u] = self.tempo
-        self.tempo += 1
+    def condensacao(self):
+        return self.congelar().condensacao()
 
-        while stack:
-            v, children = stack[-1]
-            try:
-                w, _ = next(children)
-                if not visited[w]:
-                    parent[w] = v
-                    visited[w] = True
-                    num[w] = low[w] = self.tempo
-                    self.tempo += 1
-                    stack.append((w, iter(self.lista_adj.adjacencias[w])))
-                elif w != parent[v]:
-                    low[v] = min(low[v], num[w])
-            except StopIteration:
-                stack.pop()
-                if parent[v] != -1:
-                    low[parent[v]] = min(low[parent[v]], low[v])
-                    if low[v] > num[parent[v]]:
-                        pontes.append((parent[v], v))
-
-    def identificar_articulacoes(self):
-        num = [0] * self.num_vertices
-        low = [0] * self.num_vertices
-        parent = [-1] * self.num_vertices
-        self.tempo = 1
-        articulacoes = set()
-        visited = [False] * self.num_vertices
+    def arvore_blocos_corte(self):
+        return self.congelar().arvore_blocos_corte()
 
-        for u in range(self.num_vertices):
-            if not visited[u]:
-                self._articulacao_dfs(u, visited, parent, num, low, articulacoes)
-        return list(articulacoes)
-
-    def _articulacao_dfs(self, u, visited, parent, num, low, articulacoes):
-        stack = [(u, iter(self.lista_adj.adjacencias[u]), False)]
-        children = 0
-        visited[u] = True
-        num[u] = low[u] = self.tempo
-        self.tempo += 1
-        articulation_found = False
-
-        while stack:
-            v, children_iter, is_return = stack[-1]
-            if not is_return:
-                stack[-1] = (v, children_iter, True)
-                try:
-                    w, _ = next(children_iter)
-                    if not visited[w]:
-                        parent[w] = v
-                        children += 1
-                        visited[w] = True
-                        num[w] = low[w] = self.tempo
-                        self.tempo += 1
-                        stack.append((w, iter(self.lista_adj.adjacencias[w]), False))
-                    elif w != parent[v]:
-                        low[v] = min(low[v], num[w])
-                except StopIteration:
-                    stack.pop()
-                    if parent[v] != -1:
-                        low[parent[v]] = min(low[parent[v]], low[v])
-                        if low[v] >= num[parent[v]]:
-                            articulacoes.add(parent[v])
-                    else:
-                        if children > 1:
-                            articulacoes.add(v)
-            else:
-                stack.pop()
+    def fecho_transitivo(self):
+        return self.congelar().fecho_transitivo()
 
-    def grafo_conexo(self):
-        visitados = [False] * self.num_vertices
-        stack = [0]
-        visitados[0] = True
-        while stack:
-            v = stack.pop()
-            for w, _ in self.lista_adj.adjacencias[v]:
-                if not visitados[w]:
-                    visitados[w] = True
-                    stack.append(w)
-        return all(visitados)
-
-    def kosaraju_scc(self):
-        visited = [False] * self.num_vertices
-        stack = []
-
-        def dfs_fill_order(v):
-            visited[v] = True
-            for w, _ in self.lista_adj.adjacencias[v]:
-                if not visited[w]:
-                    dfs_fill_order(w)
-            stack.append(v)
-
-        for i in range(self.num_vertices):
-            if not visited[i]:
-                dfs_fill_order(i)
-
-        transposto = {i: [] for i in range(self.num_vertices)}
-        for u in self.lista_adj.adjacencias:
-            for v, peso in self.lista_adj.adjacencias[u]:
-                transposto[v].append((u, peso))
-
-        visited = [False] * self.num_vertices
-        scc_list = []
+    def alcanca(self, u, v):
+        return self.congelar().fecho_transitivo().alcanca(u, v)
 
-        def dfs_transpose(v, component):
-            visited[v] = True
-            component.append(v)
-            for w, _ in transposto[v]:
-                if not visited[w]:
-                    dfs_transpose(w, component)
+    def dijkstra(self, origem):
+        return self.congelar().dijkstra(origem)
 
-        while stack:
-            v = stack.pop()
-            if not visited[v]:
-                component = []
-                dfs_transpose(v, component)
-                scc_list.append(component)
+    def caminho_minimo(self, origem, destino):
+        return self.congelar().caminho_minimo(origem, destino)
 
-        return scc_list
+    def distancias_lote(self, origens=None, processos=None):
+        return self.congelar().distancias_lote(origens, processos)
 
+    @_memorizado
     def grafo_fortemente_conexo(self):
         if not self.dirigido:
             return self.grafo_conexo()
-        scc = self.kosaraju_scc()
-        return len(scc) == 1
+        return self.componentes_fortes()[0] == 1
 
+    @_memorizado
     def grafo_conexo_fraco(self):
         if not self.dirigido:
             return self.grafo_conexo()
-        visitados = [False] * self.num_vertices
-        stack = [0]
-        visitados[0] = True
-        while stack:
-            v = stack.pop()
-            for w, _ in self.lista_adj.adjacencias[v]:
-                if not visitados[w]:
-                    visitados[w] = True
-                    stack.append(w)
-            for u in range(self.num_vertices):
-                if self.lista_adj.checar_adjacencia(u, v) and not visitados[u]:
-                    visitados[u] = True
-                    stack.append(u)
-        return all(visitados)
+        return self.congelar().rotular_componentes()[0] == 1
 
+    @_memorizado
     def grafo_semi_fortemente_conexo(self):
         if not self.dirigido:
             return self.grafo_conexo()
-        for i in range(self.num_vertices):
-            visitados = [False] * self.num_vertices
-            stack = [i]
-            visitados[i] = True
-            while stack:
-                v = stack.pop()
-                for w, _ in self.lista_adj.adjacencias[v]:
-                    if not visitados[w]:
-                        visitados[w] = True
-                        stack.append(w)
-                for u in range(self.num_vertices):
-                    if self.lista_adj.checar_adjacencia(u, v) and not visitados[u]:
-                        visitados[u] = True
-                        stack.append(u)
-            if not all(visitados):
-                return False
-        return True
+        # Unilateral se a condensação tiver um caminho hamiltoniano: componentes consecutivos na ordem topológica ligados por um arco
+        dag, _ = self.condensacao()
+        return all(c + 1 in dag.vizinhos(c) for c in range(dag.num_vertices - 1))
 
     def fleury(self):
         if not self.grafo_euleriano():
             print("O grafo não é Euleriano.")
             return []
-        grafo_copia = Grafo(self.num_vertices, self.dirigido, self.nome)
-        grafo_copia.lista_adj.adjacencias = {v: list(self.lista_adj.adjacencias[v]) for v in self.lista_adj.adjacencias}
-        grafo_copia.matriz_adj.adj_matrix = [row.copy() for row in self.matriz_adj.adj_matrix]
-        grafo_copia.matriz_inc.inc_matrix = [row.copy() for row in self.matriz_inc.inc_matrix]
-        grafo_copia.edge_list = list(self.edge_list)
-        grafo_copia.vertex_labels = dict(self.vertex_labels)
+        return self.congelar().hierholzer()
 
-        caminho = []
-        atual = 0
-        while grafo_copia.contar_vertices_arestas()[1] > 0:
-            if not grafo_copia.lista_adj.adjacencias[atual]:
-                break
-            for vizinho, _ in list(grafo_copia.lista_adj.adjacencias[atual]):
-                grafo_copia.remover_aresta(atual, vizinho)
-                if not grafo_copia.grafo_conexo():
-                    grafo_copia.adicionar_aresta(atual, vizinho)
-                else:
-                    caminho.append((atual, vizinho))
-                    atual = vizinho
-                    break
-        return caminho
+    def caminho_euleriano(self):
+        return self.congelar().hierholzer()
 
+    @_memorizado
     def grafo_euleriano(self):
-        if not self.grafo_conexo():
-            return False
-        graus = [len(self.lista_adj.adjacencias[v]) for v in self.lista_adj.adjacencias]
-        return all(g % 2 == 0 for g in graus)
+        return self.congelar().tipo_euleriano() == "circuito"
 
-    def exportar_para_gexf(self, nome_arquivo="grafo.gexf"):
+    def exportar_para_gexf(self, nome_arquivo="grafo.gexf", linhas_por_bloco=10000):
         dados_dir = "dados"
         if not os.path.exists(dados_dir):
             os.makedirs(dados_dir)
-        with open(os.path.join(dados_dir, nome_arquivo), "w", encoding="utf-8") as arquivo:
-            arquivo.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-            arquivo.write('<gexf xmlns="http://www.gexf.net/1.3draft" version="1.3">\n')
-            arquivo.write('  <graph mode="static" defaultedgetype="{}">\n'.format("directed" if self.dirigido else "undirected"))
-            arquivo.write("    <nodes>\n")
+        with _arquivo_atomico(os.path.join(dados_dir, nome_arquivo), "w", encoding="utf-8") as arquivo:
+            buffer = [
+                '<?xml version="1.0" encoding="UTF-8"?>\n',
+                '<gexf xmlns="http://www.gexf.net/1.3draft" version="1.3">\n',
+                '  <graph mode="static" defaultedgetype="{}">\n'.format("directed" if self.dirigido else "undirected"),
+                "    <nodes>\n",
+            ]
             for vertice in range(self.num_vertices):
-                label = self.vertex_labels.get(vertice, f"V{vertice + 1}")
-                arquivo.write(f'      <node id="{vertice}" label="{label}" />\n')
-            arquivo.write("    </nodes>\n")
-            arquivo.write("    <edges>\n")
-            for i, edge in enumerate(self.edge_list):
-                u = edge['u']
-                v = edge['v']
-                peso = edge['peso']
-                label = edge['label'] if edge['label'] else ""
-                arquivo.write(f'      <edge id="{i}" source="{u}" target="{v}" weight="{peso}" label="{label}" />\n')
-            arquivo.write("    </edges>\n")
-            arquivo.write("  </graph>\n")
-            arquivo.write("</gexf>\n")
-
-    def exportar_para_ppm(self, nome_arquivo="grafo.ppm"):
+                label = _escapar_atributo(self.vertex_labels[vertice])
+                buffer.append(f'      <node id="{vertice}" label="{label}" />\n')
+                if len(buffer) >= linhas_por_bloco:
+                    arquivo.write("".join(buffer))
+                    buffer.clear()
+            buffer.append("    </nodes>\n")
+            buffer.append("    <edges>\n")
+            for i, (u, v, peso, label) in enumerate(self._armazem.itens()):
+                label = _escapar_atributo(label) if label else ""
+                buffer.append(f'      <edge id="{i}" source="{u}" target="{v}" weight="{peso}" label="{label}" />\n')
+                if len(buffer) >= linhas_por_bloco:
+                    arquivo.write("".join(buffer))
+                    buffer.clear()
+            buffer.append("    </edges>\n")
+            buffer.append("  </graph>\n")
+            buffer.append("</gexf>\n")
+            arquivo.write("".join(buffer))
+
+    def exportar_para_ppm(self, nome_arquivo="grafo.ppm", passo_quadros=1, max_quadros=None, fluxo_quadros=None):
         dados_dir = "dados"
         if not os.path.exists(dados_dir):
             os.makedirs(dados_dir)
-        
-        largura = 800
-        altura = 800
-        raio_vertice = 20
-        num_cols = int(self.num_vertices ** 0.5) + 1
-        num_rows = (self.num_vertices // num_cols) + 1
-        espacamento_x = largura // (num_cols + 1)
-        espacamento_y = altura // (num_rows + 1)
-        posicoes = {}
-
-        idx = 0
-        for row in range(1, num_rows + 1):
-            for col in range(1, num_cols + 1):
-                if idx < self.num_vertices:
-                    x = col * espacamento_x
-                    y = row * espacamento_y
-                    posicoes[idx] = (x, y)
-                    idx += 1
-
-        caminho_frames = os.path.join(dados_dir, "imagens_ppm")
-        if not os.path.exists(caminho_frames):
-            os.makedirs(caminho_frames)
-
-        imagem_base = [[(255, 255, 255) for _ in range(largura)] for _ in range(altura)]
-        for i in range(self.num_vertices):
-            x, y = posicoes[i]
-            self.desenhar_circulo(imagem_base, x, y, raio_vertice, (0, 0, 255))
-
-        for idx in range(len(self.edge_list)):
-            imagem = [row.copy() for row in imagem_base]
-            for edge in self.edge_list[:idx+1]:
-                u = edge['u']
-                v = edge['v']
-                x1, y1 = posicoes[u]
-                x2, y2 = posicoes[v]
-                self.desenhar_linha(imagem, x1, y1, x2, y2, (0, 0, 0))
-            frame_nome = f"frame_{self.frame_count}.ppm"
-            self.salvar_imagem_ppm(imagem, os.path.join(caminho_frames, frame_nome))
-            self.frame_count += 1
-
-        imagem_final = [row.copy() for row in imagem_base]
-        for edge in self.edge_list:
-            u = edge['u']
-            v = edge['v']
-            x1, y1 = posicoes[u]
-            x2, y2 = posicoes[v]
-            self.desenhar_linha(imagem_final, x1, y1, x2, y2, (0, 0, 0))
-        self.salvar_imagem_ppm(imagem_final, os.path.join(dados_dir, nome_arquivo))
+        if fluxo_quadros is None:
+            saida = SaidaQuadrosArquivos(os.path.join(dados_dir, "imagens_ppm"), self.frame_count)
+        else:
+            if isinstance(fluxo_quadros, str):
+                fluxo_quadros = os.path.join(dados_dir, fluxo_quadros)
+            saida = SaidaQuadrosFluxo(fluxo_quadros)
+        origens, destinos = self._vetores_arestas()
+        numero = _renderizar_ppm(self.num_vertices, origens, destinos, os.path.join(dados_dir, nome_arquivo),
+                                 saida, passo_quadros, max_quadros)
+        if fluxo_quadros is None:
+            self.frame_count = numero
         print(f"Imagem PPM exportada como {os.path.join(dados_dir, nome_arquivo)}")
 
+    def _vetores_arestas(self):
+        armazem = self._armazem
+        if len(armazem) == len(armazem.vivas):
+            return armazem.origens, armazem.destinos
+        ids = list(armazem.ids())
+        return array('q', map(armazem.origens.__getitem__, ids)), array('q', map(armazem.destinos.__getitem__, ids))
+
+    def exportar_todos(self, nome_base=None, processos=None, passo_quadros=1, max_quadros=None):
+        return exportar_todos([self], [nome_base] if nome_base else None, processos, 2, passo_quadros, max_quadros)[0]
+
     def exportar_para_txt(self, nome_arquivo="grafo.txt"):
         dados_dir = "dados"
         if not os.path.exists(dados_dir):
             os.makedirs(dados_dir)
-        with open(os.path.join(dados_dir, nome_arquivo), 'w', encoding='utf-8') as f:
+        with _arquivo_atomico(os.path.join(dados_dir, nome_arquivo), 'w', encoding='utf-8') as f:
             f.write(f"Grafo: {self.nome}\n")
             f.write(f"Direcionado: {'Sim' if self.dirigido else 'Não'}\n")
             f.write(f"Vértices: {self.num_vertices}\n")
-            f.write(f"Arestas: {len(self.edge_list)}\n\n")
+            f.write(f"Arestas: {len(self._armazem)}\n\n")
 
             f.write("Lista de Adjacência:\n")
             for vertice, adj in self.lista_adj.adjacencias.items():
                 vertice_exibicao = vertice + 1
-                adj_exibicao = ", ".join([f"{v + 1}({peso})" for v, peso in adj])
+                adj_exibicao = ", ".join([f"{v + 1}({peso})" for v, peso in adj.items()])
                 f.write(f"{vertice_exibicao}: {adj_exibicao}\n")
 
+            if self.matrizes == "nunca":
+                return
+
             f.write("\nMatriz de Adjacência:\n")
             header = "   " + " ".join([f"{i+1:3}" for i in range(self.num_vertices)])
             f.write(header + "\n")
-            for i, row in enumerate(self.matriz_adj.adj_matrix):
+            for i, row in enumerate(self.matriz_adj.linhas()):
                 linha = f"{i+1:3} " + " ".join([f"{val:3}" for val in row])
                 f.write(linha + "\n")
 
             f.write("\nMatriz de Incidência:\n")
-            if self.edge_list:
-                header = "   " + " ".join([f"{i+1:3}" for i in range(len(self.edge_list))])
+            if self._armazem:
+                header = "   " + " ".join([f"{i+1:3}" for i in range(len(self._armazem))])
                 f.write(header + "\n")
                 for i, row in enumerate(self.matriz_inc.inc_matrix):
                     linha = f"{i+1:3} " + " ".join([f"{val:3}" for val in row])
@@ -502,81 +2560,38 @@ class Grafo:
                 f.write("Sem arestas.\n")
 
     def desenhar_linha(self, imagem, x1, y1, x2, y2, cor):
-        x1 = int(x1)
-        y1 = int(y1)
-        x2 = int(x2)
-        y2 = int(y2)
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
-        x, y = x1, y1
-        if x2 > x1:
-            sx = 1
-        else:
-            sx = -1
-        if y2 > y1:
-            sy = 1
-        else:
-            sy = -1
-        if dx > dy:
-            err = dx // 2
-            while x != x2:
-                if 0 <= x < len(imagem[0]) and 0 <= y < len(imagem):
-                    imagem[y][x] = cor
-                err -= dy
-                if err < 0:
-                    y += sy
-                    err += dx
-                x += sx
-        else:
-            err = dy // 2
-            while y != y2:
-                if 0 <= x < len(imagem[0]) and 0 <= y < len(imagem):
-                    imagem[y][x] = cor
-                err -= dx
-                if err < 0:
-                    x += sx
-                    err += dy
-                y += sy
-
-        if 0 <= x2 < len(imagem[0]) and 0 <= y2 < len(imagem):
-            imagem[y2][x2] = cor
+        imagem.desenhar_linha(x1, y1, x2, y2, cor)
 
     def desenhar_circulo(self, imagem, x0, y0, raio, cor):
-        x0 = int(x0)
-        y0 = int(y0)
-        for y in range(y0 - raio, y0 + raio + 1):
-            for x in range(x0 - raio, x0 + raio + 1):
-                if 0 <= x < len(imagem[0]) and 0 <= y < len(imagem):
-                    if (x - x0) ** 2 + (y - y0) ** 2 <= raio ** 2:
-                        imagem[y][x] = cor
+        imagem.desenhar_circulo(x0, y0, raio, cor)
 
     def salvar_imagem_ppm(self, imagem, nome_arquivo):
-        with open(nome_arquivo, "wb") as f:
-            f.write(b"P6\n")
-            f.write(f"{len(imagem[0])} {len(imagem)}\n".encode())
-            f.write(b"255\n")
-            for row in imagem:
-                for pixel in row:
-                    f.write(bytes(pixel))
+        imagem.salvar(nome_arquivo)
 
     def exibir_lista_adjacencia(self):
         print("Lista de Adjacência:")
         for vertice, adj in self.lista_adj.adjacencias.items():
             vertice_exibicao = vertice + 1
-            adj_exibicao = [(v + 1, peso) for v, peso in adj]
+            adj_exibicao = [(v + 1, peso) for v, peso in adj.items()]
             print(f"{vertice_exibicao}: {adj_exibicao}")
 
     def exibir_matriz_adjacencia(self):
         print("Matriz de Adjacência:")
+        if self.matrizes == "nunca":
+            print("Desativada para este grafo.")
+            return
         header = "   " + " ".join([f"{i+1:3}" for i in range(self.num_vertices)])
         print(header)
-        for i, row in enumerate(self.matriz_adj.adj_matrix):
+        for i, row in enumerate(self.matriz_adj.linhas()):
             linha = f"{i+1:3} " + " ".join([f"{val:3}" for val in row])
             print(linha)
 
     def exibir_matriz_incidencia(self):
         print("Matriz de Incidência:")
-        header = "   " + " ".join([f"{i+1:3}" for i in range(len(self.edge_list))])
+        if self.matrizes == "nunca":
+            print("Desativada para este grafo.")
+            return
+        header = "   " + " ".join([f"{i+1:3}" for i in range(len(self._armazem))])
         print(header)
         for i, row in enumerate(self.matriz_inc.inc_matrix):
             linha = f"{i+1:3} " + " ".join([f"{val:3}" for val in row])
@@ -589,38 +2604,171 @@ class Grafo:
         print()
         self.exibir_matriz_incidencia()
 
+def exportar_todos(grafos, nomes=None, processos=None, threads=None, passo_quadros=1, max_quadros=None):
+    # GEXF e TXT são dominados por escrita e vão para threads; o raster do PPM vai para processos
+    if nomes is None:
+        nomes = [grafo.nome.replace(" ", "_") for grafo in grafos]
+    dados_dir = "dados"
+    diretorio_quadros = os.path.join(dados_dir, "imagens_ppm")
+    if not os.path.exists(diretorio_quadros):
+        os.makedirs(diretorio_quadros)
+    tempos = [{} for _ in grafos]
+    # Cada grafo recebe uma faixa própria de quadros, já que os processos gravam no mesmo diretório ao mesmo tempo
+    proximo_quadro = 0
+    with ThreadPoolExecutor(threads or 2 * len(grafos) or 1) as pool_threads, \
+            ProcessPoolExecutor(processos or min(len(grafos), os.cpu_count() or 1) or 1) as pool_processos:
+        tarefas = []
+        for i, (grafo, nome) in enumerate(zip(grafos, nomes)):
+            origens, destinos = grafo._vetores_arestas()
+            inicio_quadros = max(grafo.frame_count, proximo_quadro)
+            proximo_quadro = inicio_quadros - (-len(origens) // _passo_quadros(len(origens), passo_quadros, max_quadros))
+            saida = SaidaQuadrosArquivos(diretorio_quadros, inicio_quadros)
+            tarefas.append((i, "ppm", pool_processos.submit(
+                _cronometrar, _renderizar_ppm, grafo.num_vertices, origens, destinos,
+                os.path.join(dados_dir, f"{nome}.ppm"), saida, passo_quadros, max_quadros)))
+            tarefas.append((i, "gexf", pool_threads.submit(_cronometrar, grafo.exportar_para_gexf, f"{nome}.gexf")))
+            tarefas.append((i, "txt", pool_threads.submit(_cronometrar, grafo.exportar_para_txt, f"{nome}.txt")))
+        for i, formato, tarefa in tarefas:
+            resultado, tempos[i][formato] = tarefa.result()
+            if formato == "ppm":
+                grafos[i].frame_count = resultado
+    return tempos
+
+def _exibir_tempos_exportacao(nomes, tempos):
+    for nome, tempo in zip(nomes, tempos):
+        detalhes = ", ".join(f"{formato.upper()} {segundos:.4f}s" for formato, segundos in sorted(tempo.items()))
+        print(f"  {nome}: {detalhes}")
+
+def _um_item(obj, resultado):
+    return 1
+
+def _itens_retornados(obj, resultado):
+    return resultado or 0
+
+def _itens_grafo(obj, resultado):
+    # Grafo carregado ainda não montado: ler obj._armazem dispararia a montagem, então o CSR do snapshot conta as arestas
+    carregado = obj.__dict__.get("_csr_carregado")
+    if carregado is not None:
+        return obj.num_vertices + carregado.rotulos.get("num_arestas", carregado.num_arcos())
+    return obj.num_vertices + len(obj._armazem)
+
+def _itens_csr(obj, resultado):
+    return obj.num_vertices + len(obj.destinos)
+
+_METODOS_INSTRUMENTADOS = {
+    ListaAdjacencia: {"adicionar_aresta": _um_item, "remover_aresta": _um_item, "checar_adjacencia": _um_item},
+    MatrizAdjacencia: {"adicionar_aresta": _um_item, "remover_aresta": _um_item, "checar_adjacencia": _um_item},
+    MatrizAdjacenciaCompacta: {"adicionar_aresta": _um_item, "remover_aresta": _um_item, "checar_adjacencia": _um_item},
+    MatrizIncidencia: {"adicionar_aresta": _um_item, "remover_aresta": _um_item, "checar_adjacencia": _um_item},
+    GrafoCSR: {
+        "grafo_conexo": _itens_csr,
+        "identificar_pontes_tarjan": _itens_csr,
+        "identificar_articulacoes": _itens_csr,
+        "kosaraju_scc": _itens_csr,
+        "componentes_fortes": _itens_csr,
+        "condensacao": _itens_csr,
+        "rotular_componentes": _itens_csr,
+        "hierholzer": _itens_csr,
+    },
+    Grafo: {
+        "adicionar_aresta": _um_item,
+        "adicionar_arestas": _itens_retornados,
+        "remover_aresta": _um_item,
+        "adicionar_vertice": _um_item,
+        "congelar": _itens_grafo,
+        "identificar_pontes_naive": _itens_grafo,
+        "identificar_pontes_tarjan": _itens_grafo,
+        "identificar_articulacoes": _itens_grafo,
+        "grafo_conexo": _itens_grafo,
+        "kosaraju_scc": _itens_grafo,
+        "grafo_conexo_fraco": _itens_grafo,
+        "grafo_semi_fortemente_conexo": _itens_grafo,
+        "fleury": _itens_grafo,
+        "exportar_para_gexf": _itens_grafo,
+        "exportar_para_ppm": _itens_grafo,
+        "exportar_para_txt": _itens_grafo,
+        "exportar_todos": _itens_grafo,
+    },
+}
+
+class Instrumentacao:
+    def __init__(self):
+        self.estatisticas = {}
+        self.ganchos = []
+        self._originais = {}
+
+    @property
+    def ativa(self):
+        return bool(self._originais)
+
+    def ativar(self):
+        # Os métodos só são substituídos enquanto a instrumentação está ativa; desativada, o custo é zero
+        if self._originais:
+            return
+        for classe, metodos in _METODOS_INSTRUMENTADOS.items():
+            for nome, contar_itens in metodos.items():
+                original = classe.__dict__[nome]
+                self._originais[(classe, nome)] = original
+                setattr(classe, nome, self._envolver(f"{classe.__name__}.{nome}", original, contar_itens))
+
+    def desativar(self):
+        for (classe, nome), original in self._originais.items():
+            setattr(classe, nome, original)
+        self._originais.clear()
+
+    def _envolver(self, nome, metodo, contar_itens):
+        estatistica = self.estatisticas.setdefault(nome, [0, 0.0, 0])
+        ganchos = self.ganchos
+        relogio = time.perf_counter
+
+        @functools.wraps(metodo)
+        def instrumentado(obj, *args, **kwargs):
+            inicio = relogio()
+            resultado = metodo(obj, *args, **kwargs)
+            duracao = relogio() - inicio
+            itens = contar_itens(obj, resultado)
+            estatistica[0] += 1
+            estatistica[1] += duracao
+            estatistica[2] += itens
+            for gancho in ganchos:
+                gancho(nome, duracao, itens)
+            return resultado
+
+        return instrumentado
+
+    def registrar_gancho(self, gancho):
+        self.ganchos.append(gancho)
+        return gancho
+
+    def remover_gancho(self, gancho):
+        self.ganchos.remove(gancho)
+
+    def zerar(self):
+        for estatistica in self.estatisticas.values():
+            estatistica[:] = [0, 0.0, 0]
+
+    def snapshot(self):
+        return {
+            nome: {"chamadas": chamadas, "tempo": tempo, "itens": itens}
+            for nome, (chamadas, tempo, itens) in sorted(self.estatisticas.items())
+            if chamadas
+        }
+
+    def exportar(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.snapshot(), arquivo, indent=2)
+
+    def exibir(self):
+        for nome, dados in self.snapshot().items():
+            print(f"{nome:<45} {dados['chamadas']:>8} chamadas {dados['tempo']:>10.4f} s {dados['itens']:>10} itens")
+
+INSTRUMENTACAO = Instrumentacao()
+
 def teste_desempenho():
-    tamanhos = [100, 1000, 10000, 100000]
-    for tamanho in tamanhos:
-        grafo = Grafo(tamanho)
-        num_componentes = 5
-        tamanho_componente = tamanho // num_componentes
-        vertices_componentes = []
-
-        for i in range(num_componentes):
-            vertices = list(range(i * tamanho_componente, (i + 1) * tamanho_componente))
-            vertices_componentes.append(vertices)
-            for j in range(len(vertices)):
-                u = vertices[j]
-                v = vertices[(j + 1) % len(vertices)]
-                grafo.adicionar_aresta(u, v)
-
-        for i in range(num_componentes - 1):
-            u = vertices_componentes[i][-1]
-            v = vertices_componentes[i + 1][0]
-            grafo.adicionar_aresta(u, v)
-
-        print(f"\nTeste para {tamanho} vértices e {grafo.contar_vertices_arestas()[1]} arestas:")
-        inicio_naive = time.time()
-        pontes_naive = grafo.identificar_pontes_naive()
-        fim_naive = time.time()
-        tempo_naive = fim_naive - inicio_naive
-        print(f"Método Naive: {len(pontes_naive)} pontes encontradas em {tempo_naive:.4f} segundos.")
-        inicio_tarjan = time.time()
-        pontes_tarjan = grafo.identificar_pontes_tarjan()
-        fim_tarjan = time.time()
-        tempo_tarjan = fim_tarjan - inicio_tarjan
-        print(f"Método Tarjan: {len(pontes_tarjan)} pontes encontradas em {tempo_tarjan:.4f} segundos.")
+    # Importado aqui porque o módulo benchmark importa a classe Grafo deste arquivo
+    import benchmark
+    benchmark.executar(familias=["aneis"], tamanhos=[100, 1000, 10000, 100000],
+                       operacoes=["pontes_naive", "pontes_tarjan", "articulacoes"], repeticoes=3)
 
 def menu():
     grafos_prontos = {
@@ -658,13 +2806,15 @@ def menu():
         print("1. Analisar Grafos Prontos")
         print("2. Criar Grafo Manualmente")
         print("3. Realizar Teste de Desempenho (Parte 2)")
-        print("4. Sair")
+        print("4. Carregar Grafo de Arquivo (lista de arestas)")
+        print("5. Sair")
         try:
             opcao = int(input("Escolha uma opção: "))
         except ValueError:
             print("Entrada inválida. Por favor, digite um número.")
             continue
         if opcao == 1:
+            grafos = []
             for nome, info in grafos_prontos.items():
                 arestas = info['arestas']
                 dirigido = info['dirigido']
@@ -689,10 +2839,12 @@ def menu():
                     print("Semi-fortemente Conexo:", grafo.grafo_semi_fortemente_conexo())
                 else:
                     print("Conexo:", grafo.grafo_conexo())
-                grafo.exportar_para_gexf(f"{grafo.nome}.gexf")
-                grafo.exportar_para_ppm(f"{grafo.nome}.ppm")
-                grafo.exportar_para_txt(f"{grafo.nome}.txt")
-                print(f"Grafo '{grafo.nome}' exportado para os formatos GEXF, PPM e TXT no diretório 'dados'.")
+                grafos.append(grafo)
+            inicio = time.perf_counter()
+            nomes = [grafo.nome for grafo in grafos]
+            tempos = exportar_todos(grafos, nomes)
+            print(f"\nGrafos exportados para os formatos GEXF, PPM e TXT no diretório 'dados' em {time.perf_counter() - inicio:.4f} segundos:")
+            _exibir_tempos_exportacao(nomes, tempos)
         elif opcao == 2:
             try:
                 num_vertices = int(input("Digite o número de vértices: "))
@@ -790,10 +2942,9 @@ def menu():
                     nome = input("Digite o nome base dos arquivos (sem extensão): ").strip()
                     if not nome:
                         nome = grafo.nome.replace(" ", "_")  # Substituir espaços por underscores
-                    grafo.exportar_para_gexf(f"{nome}.gexf")
-                    grafo.exportar_para_ppm(f"{nome}.ppm")
-                    grafo.exportar_para_txt(f"{nome}.txt")
+                    tempos = grafo.exportar_todos(nome)
                     print("Exportação concluída.")
+                    _exibir_tempos_exportacao([nome], [tempos])
                 elif escolha == 11:
                     nome_ppm = input("Digite o nome do arquivo PPM (com extensão .ppm): ").strip()
                     if not nome_ppm.endswith('.ppm'):
@@ -803,16 +2954,30 @@ def menu():
                 elif escolha == 12:
                     # Ao sair do menu de criação manual, salvar automaticamente
                     export_nome = grafo.nome.replace(" ", "_")  # Substituir espaços por underscores
-                    grafo.exportar_para_gexf(f"{export_nome}.gexf")
-                    grafo.exportar_para_ppm(f"{export_nome}.ppm")
-                    grafo.exportar_para_txt(f"{export_nome}.txt")
+                    tempos = grafo.exportar_todos(export_nome)
                     print(f"Grafo '{grafo.nome}' exportado automaticamente após a criação.")
+                    _exibir_tempos_exportacao([export_nome], [tempos])
                     break
                 else:
                     print("Opção inválida, tente novamente.")
         elif opcao == 3:
             teste_desempenho()
         elif opcao == 4:
+            caminho = input("Digite o caminho do arquivo: ").strip()
+            dirigido = input("O grafo é direcionado? (s/n): ").lower() == 's'
+            indice_base = 1 if input("Os vértices começam em 1? (s/n): ").lower() == 's' else 0
+            try:
+                inicio = time.perf_counter()
+                grafo = Grafo.carregar_lista_arestas(caminho, dirigido, indice_base=indice_base)
+                duracao = time.perf_counter() - inicio
+            except (OSError, ValueError) as erro:
+                print(f"Erro ao carregar o arquivo: {erro}")
+                continue
+            num_vertices, num_arestas = grafo.contar_vertices_arestas()
+            print(f"\n{grafo.nome}: {num_vertices} vértices e {num_arestas} arestas carregados em {duracao:.4f} segundos.")
+            print("Pontes (Tarjan):", len(grafo.congelar().identificar_pontes_tarjan()))
+            print("Articulações:", len(grafo.congelar().identificar_articulacoes()))
+        elif opcao == 5:
             print("Saindo do programa. Até logo!")
             break
         else: